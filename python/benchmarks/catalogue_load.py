@@ -0,0 +1,42 @@
+"""Compares the cold start of VideoLibrary from the text catalogue and from
+the compiled columnar catalogue, on a synthetic catalogue.
+
+    python3 -m benchmarks.catalogue_load [rows]
+"""
+
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from benchmarks.synthetic import write_catalogue
+from src.catalogue_format import compile_catalogue
+from src.video_library import VideoLibrary
+
+
+def best_of(runs, function, *args):
+    """Returns the fastest of several timed calls, in seconds."""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(rows=1_000_000, runs=3):
+    with tempfile.TemporaryDirectory() as directory:
+        text = write_catalogue(Path(directory) / "videos.txt", rows)
+        compiled = Path(directory) / "videos.col"
+        compile_time = best_of(1, compile_catalogue, text, compiled)
+        text_time = best_of(runs, VideoLibrary, text)
+        compiled_time = best_of(runs, VideoLibrary, compiled)
+    print(f"{rows} videos")
+    print(f"compile:        {compile_time:7.3f} s (once)")
+    print(f"load text:      {text_time:7.3f} s")
+    print(f"load compiled:  {compiled_time:7.3f} s")
+    print(f"speedup:        {text_time / compiled_time:7.1f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
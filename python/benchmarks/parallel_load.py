@@ -0,0 +1,37 @@
+"""Times loading a text catalogue into VideoLibrary with 1, 2, 4 and 8
+worker processes, on a synthetic catalogue, and reports the speedup over
+one worker.
+
+    python3 -m benchmarks.parallel_load [rows]
+
+The speedup is bounded by the number of cores, and by the part of the
+load left to the parent process: building the Video objects, merging
+the sorted parts and appending the title trigram postings.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.catalogue_load import best_of
+from benchmarks.synthetic import write_catalogue
+from src.video_library import VideoLibrary
+
+WORKERS = (1, 2, 4, 8)
+
+
+def main(rows=2_000_000, runs=3):
+    with tempfile.TemporaryDirectory() as directory:
+        text = write_catalogue(Path(directory) / "videos.txt", rows)
+        timings = {
+            workers: best_of(runs, lambda: VideoLibrary(text, workers=workers))
+            for workers in WORKERS}
+    print(f"{rows} videos, {os.cpu_count()} cores")
+    for workers, seconds in timings.items():
+        print(f"{workers} workers: {seconds:7.3f} s  "
+              f"speedup {timings[1] / seconds:4.2f}x")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,26 @@
+"""Synthetic catalogues for the benchmarks."""
+
+import random
+
+TAGS = ["#animal", "#cat", "#dog", "#google", "#career", "#music", "#news",
+        "#sport", "#gaming", "#comedy", "#science", "#travel", "#food",
+        "#howto", "#education", "#film"]
+WORDS = ["Amazing", "Funny", "Another", "Video", "Life", "at", "Google",
+         "Cats", "Dogs", "about", "nothing", "Best", "of", "the", "Week",
+         "Tutorial", "Review", "Live", "Highlights", "Official"]
+
+
+def iter_rows(rows, seed=0):
+    """Yields rows rows of 'title | video_id | tags' catalogue text."""
+    rng = random.Random(seed)
+    for number in range(rows):
+        title = " ".join(rng.choices(WORDS, k=rng.randint(2, 6)))
+        tags = " , ".join(rng.sample(TAGS, rng.randint(0, 4)))
+        yield f"{title} {number} | video_{number:08d}_id | {tags}\n"
+
+
+def write_catalogue(path, rows, seed=0):
+    """Writes a synthetic catalogue with the given number of rows to path."""
+    with open(path, "w") as catalogue_file:
+        catalogue_file.writelines(iter_rows(rows, seed))
+    return path
@@ -0,0 +1,93 @@
+"""Hammers one VideoPlayer with playlist changes and searches from a thread
+pool, checks that the playlists come out consistent and compares the
+throughput with the same work done on one thread without locking.
+
+    python3 -m benchmarks.thread_stress [workers] [operations per worker]
+"""
+
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.synthetic import write_catalogue
+from src.output_sink import ListSink
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+
+SHARED = "shared"
+
+
+def _work(player, video_ids, worker, operations):
+    """Adds and removes this worker's videos and searches in between.
+
+    Every worker adds its videos to the shared playlist and to one of its
+    own, from which it removes every other one again.
+    """
+    own = f"own{worker}"
+    player.create_playlist(own)
+    for number in range(operations):
+        video_id = video_ids[worker * operations + number]
+        player.add_to_playlist(SHARED, video_id)
+        player.add_to_playlist(own, video_id)
+        player.search_videos_tag("#cat -#dog", limit=10)
+        if number % 2:
+            player.remove_from_playlist(own, video_id)
+        if number % 16 == 0:
+            # Reads the shared playlist while the others change it.
+            assert len(list(player.playlist_exists(SHARED))) >= number
+            player.play_random_video()
+
+
+def hammer(player, video_ids, workers, operations, threads=True):
+    """Runs the workload of every worker, on a pool of threads if threads.
+
+    Returns:
+        The seconds taken.
+    """
+    player.create_playlist(SHARED)
+    start = time.perf_counter()
+    if threads:
+        with ThreadPoolExecutor(workers) as pool:
+            for future in [pool.submit(_work, player, video_ids, worker,
+                                       operations)
+                           for worker in range(workers)]:
+                future.result()
+    else:
+        for worker in range(workers):
+            _work(player, video_ids, worker, operations)
+    return time.perf_counter() - start
+
+
+def check(player, video_ids, workers, operations):
+    """Raises AssertionError unless the playlists hold what was added."""
+    shared = set(player.all_playlists.get(SHARED))
+    assert shared == set(video_ids[:workers * operations]), "shared playlist"
+    for worker in range(workers):
+        first = worker * operations
+        expected = video_ids[first:first + operations:2]
+        own = list(player.all_playlists.get(f"own{worker}"))
+        assert own == expected, f"playlist of worker {worker}"
+
+
+def main(workers=8, operations=2000, rows=100_000):
+    with tempfile.TemporaryDirectory() as directory:
+        library = VideoLibrary(
+            write_catalogue(Path(directory) / "videos.txt", rows))
+    video_ids = [video.video_id for video in library]
+    # One command of each kind per step, four of them playlist changes.
+    commands = workers * operations * 4
+    for thread_safe in (False, True):
+        player = VideoPlayer(library, output=ListSink(), interactive=False,
+                             thread_safe=thread_safe)
+        elapsed = hammer(player, video_ids, workers, operations,
+                         threads=thread_safe)
+        check(player, video_ids, workers, operations)
+        label = f"{workers} threads" if thread_safe else "1 thread, unlocked"
+        print(f"{label:20} {elapsed:7.3f} s  {commands / elapsed:10.0f} "
+              "commands/s")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,49 @@
+"""Compares the memory used per Video before and after __slots__ and tag
+interning, on a synthetic catalogue.
+
+    python3 -m benchmarks.video_memory [rows]
+"""
+
+import sys
+import tracemalloc
+
+from benchmarks.synthetic import iter_rows
+from src.video import Video
+
+
+class DictVideo:
+    """The Video class as it was before __slots__ and interned tags."""
+
+    def __init__(self, video_title, video_id, video_tags):
+        self._title = video_title
+        self._video_id = video_id
+        self._tags = tuple(video_tags)
+
+
+def bytes_per_video(video_class, rows):
+    """Returns the bytes allocated per video for a catalogue of rows videos."""
+    lines = list(iter_rows(rows))
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    videos = []
+    for line in lines:
+        title, video_id, tags = (field.strip() for field in line.split("|"))
+        videos.append(video_class(
+            title, video_id,
+            [tag.strip() for tag in tags.split(",")] if tags else []))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / rows
+
+
+def main(rows=1_000_000):
+    old = bytes_per_video(DictVideo, rows)
+    new = bytes_per_video(Video, rows)
+    print(f"{rows} videos")
+    print(f"before: {old:8.1f} bytes per video")
+    print(f"after:  {new:8.1f} bytes per video")
+    print(f"saved:  {old - new:8.1f} bytes per video ({1 - new / old:.0%})")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
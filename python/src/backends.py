@@ -0,0 +1,59 @@
+"""Selects the video library and playlist backends by configuration.
+
+    memory  VideoLibrary, the whole catalogue in memory. Reads text and
+            compiled columnar catalogues.
+    mapped  MappedVideoLibrary, a file built by build_mapped_catalogue.
+    sqlite  SqliteVideoLibrary, a SQLite database. Playlists are kept in
+            the same database.
+"""
+
+from .mapped_video_library import MappedVideoLibrary, is_mapped_catalogue
+from .sqlite_backend import (
+    SqlitePlaylist, SqliteVideoLibrary, is_sqlite_catalogue)
+from .video_library import DEFAULT_CATALOGUE, VideoLibrary
+
+BACKENDS = {
+    "memory": VideoLibrary,
+    "mapped": MappedVideoLibrary,
+    "sqlite": SqliteVideoLibrary,
+}
+
+
+def detect_backend(path):
+    """Returns the name of the backend that reads the catalogue at path."""
+    if is_sqlite_catalogue(path):
+        return "sqlite"
+    if is_mapped_catalogue(path):
+        return "mapped"
+    return "memory"
+
+
+def open_library(path=None, backend=None):
+    """Opens a catalogue with the named backend.
+
+    Args:
+        path: The catalogue file, DEFAULT_CATALOGUE if None. Only the
+            memory backend reads it, the others need a file built for them.
+        backend: One of BACKENDS, detected from the file if None.
+
+    Raises:
+        ValueError: If the backend is unknown, needs a path, or cannot read
+            the file.
+    """
+    if path is None:
+        if backend not in (None, "memory"):
+            raise ValueError(f"The {backend} backend needs a catalogue "
+                             "built for it")
+        path = DEFAULT_CATALOGUE
+    if backend is None:
+        backend = detect_backend(path)
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown video library backend: {backend}")
+    return BACKENDS[backend](path)
+
+
+def library_playlists(video_library):
+    """Returns the playlist store kept with a library, None if it has none."""
+    if isinstance(video_library, SqliteVideoLibrary):
+        return SqlitePlaylist(video_library.connection)
+    return None
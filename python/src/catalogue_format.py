@@ -0,0 +1,231 @@
+"""A binary columnar video catalogue format.
+
+A compiled catalogue holds every column of the catalogue as one block, so
+loading it is a handful of reads and bulk decodes instead of parsing each
+row of text:
+
+    magic, row count
+    titles        string table, one per row
+    video ids     string table, one per row
+    tag table     string table of the distinct tags
+    tag set offsets, tag set ids
+                  the distinct combinations of tags used by the rows, tag
+                  set i is tag_set_ids[tag_set_offsets[i]:tag_set_offsets[i + 1]]
+                  as indexes into the tag table
+    row tag sets  the tag set of every row
+    title order   row numbers sorted by (title, video id)
+    posting offsets, posting ranks
+                  for every tag of the tag table, the positions in title
+                  order of the rows carrying it, sliced the same way
+    trigram table string table of the distinct trigrams of the casefolded
+                  titles
+    trigram offsets, trigram rows
+                  for every trigram, the rows whose titles contain it, see
+                  title_index, sliced the same way
+
+A string table is the number of strings followed by the strings, newline
+separated in UTF-8, so a table of one empty string is told apart from an
+empty one. All integers are uint32 except counts and lengths, which are
+uint64, and every block is preceded by its length in bytes. Integers are
+stored in native byte order, so compile the catalogue on the machine that
+loads it.
+"""
+
+from .catalogue_loader import iter_catalogue
+from .title_index import TitleIndex
+from .video import Video
+from array import array
+import struct
+import sys
+
+# The version follows the prefix, it changes with the layout.
+MAGIC_PREFIX = b"YTCOL\x00"
+MAGIC = MAGIC_PREFIX + b"v3"
+_HEADER = struct.Struct("=8sQ")
+_LENGTH = struct.Struct("=Q")
+
+
+def is_columnar_catalogue(path):
+    """Returns True if the file at path is a compiled columnar catalogue."""
+    with open(path, "rb") as catalogue_file:
+        return catalogue_file.read(len(MAGIC_PREFIX)) == MAGIC_PREFIX
+
+
+def _write_block(catalogue_file, data):
+    catalogue_file.write(_LENGTH.pack(len(data)))
+    catalogue_file.write(data)
+
+
+def _read_block(catalogue_file):
+    (length,) = _LENGTH.unpack(catalogue_file.read(_LENGTH.size))
+    data = catalogue_file.read(length)
+    if len(data) != length:
+        raise ValueError("Truncated columnar catalogue")
+    return data
+
+
+def _write_strings(catalogue_file, strings):
+    strings = list(strings)
+    _write_block(catalogue_file, _LENGTH.pack(len(strings))
+                 + "\n".join(strings).encode("utf-8"))
+
+
+def _read_strings(catalogue_file):
+    data = _read_block(catalogue_file)
+    (count,) = _LENGTH.unpack_from(data)
+    if not count:
+        return []
+    strings = data[_LENGTH.size:].decode("utf-8").split("\n")
+    if len(strings) != count:
+        raise ValueError("Corrupt string table in columnar catalogue")
+    return strings
+
+
+def _read_array(catalogue_file, typecode):
+    values = array(typecode)
+    values.frombytes(_read_block(catalogue_file))
+    return values
+
+
+class ColumnarCatalogue:
+    """A class used to hold the columns read from a compiled catalogue."""
+    def __init__(self, titles, video_ids, tag_sets, row_tag_sets,
+                 title_order, tag_postings, title_postings):
+        self.titles = titles
+        self.video_ids = video_ids
+        # The distinct tuples of tags, and the one of every row.
+        self.tag_sets = tag_sets
+        self.row_tag_sets = row_tag_sets
+        self.title_order = title_order
+        # Tag -> positions in title_order of the rows carrying the tag.
+        self.tag_postings = tag_postings
+        # Trigram -> rows whose casefolded titles contain it.
+        self.title_postings = title_postings
+
+    def video(self, row):
+        """Returns a new Video for a row."""
+        return Video.from_interned(self.titles[row], self.video_ids[row],
+                                   self.tag_sets[self.row_tag_sets[row]])
+
+
+def _sliced(offsets, values):
+    return [values[offsets[i]:offsets[i + 1]]
+            for i in range(len(offsets) - 1)]
+
+
+def write_columnar_catalogue(videos, path):
+    """Writes videos to path in the columnar format.
+
+    Returns:
+        The number of videos written.
+    """
+    videos = list(videos)
+    tag_table = {}
+    tag_sets = {}
+    row_tag_sets = array("I")
+    for video in videos:
+        tag_ids = tuple(tag_table.setdefault(tag, len(tag_table))
+                        for tag in video.tags)
+        row_tag_sets.append(tag_sets.setdefault(tag_ids, len(tag_sets)))
+    tag_set_offsets = array("I", [0])
+    tag_set_ids = array("I")
+    for tag_ids in tag_sets:
+        tag_set_ids.extend(tag_ids)
+        tag_set_offsets.append(len(tag_set_ids))
+
+    title_order = array("I", sorted(
+        range(len(videos)),
+        key=lambda i: (videos[i].title, videos[i].video_id)))
+    postings = [[] for _ in tag_table]
+    for rank, row in enumerate(title_order):
+        for tag in videos[row].tags:
+            postings[tag_table[tag]].append(rank)
+    posting_offsets = array("I", [0])
+    posting_ranks = array("I")
+    for posting in postings:
+        # A tag repeated within one video is only listed once.
+        posting_ranks.extend(sorted(set(posting)))
+        posting_offsets.append(len(posting_ranks))
+
+    title_index = TitleIndex()
+    title_index.add_all([video.video_id for video in videos],
+                        [video.title for video in videos])
+    grams = title_index.postings()
+    gram_offsets = array("I", [0])
+    gram_rows = array("I")
+    for rows in grams.values():
+        gram_rows.extend(rows)
+        gram_offsets.append(len(gram_rows))
+
+    with open(path, "wb") as catalogue_file:
+        catalogue_file.write(_HEADER.pack(MAGIC, len(videos)))
+        for strings in ((video.title for video in videos),
+                        (video.video_id for video in videos),
+                        tag_table):
+            _write_strings(catalogue_file, strings)
+        for values in (tag_set_offsets, tag_set_ids, row_tag_sets,
+                       title_order, posting_offsets, posting_ranks):
+            _write_block(catalogue_file, values.tobytes())
+        _write_strings(catalogue_file, grams)
+        for values in (gram_offsets, gram_rows):
+            _write_block(catalogue_file, values.tobytes())
+    return len(videos)
+
+
+def compile_catalogue(source_path, target_path):
+    """Compiles a videos.txt style catalogue into the columnar format.
+
+    Later rows replace earlier rows with the same video id, as they do when
+    the text catalogue is loaded.
+
+    Returns:
+        The number of videos written.
+    """
+    videos = {}
+    for chunk in iter_catalogue(source_path):
+        for video in chunk:
+            videos.pop(video.video_id, None)
+            videos[video.video_id] = video
+    return write_columnar_catalogue(videos.values(), target_path)
+
+
+def read_columnar_catalogue(path):
+    """Reads a columnar catalogue.
+
+    Returns:
+        A ColumnarCatalogue.
+    """
+    with open(path, "rb") as catalogue_file:
+        magic, count = _HEADER.unpack(catalogue_file.read(_HEADER.size))
+        if magic != MAGIC:
+            if magic.startswith(MAGIC_PREFIX):
+                raise ValueError(f"{path} was compiled by another version, "
+                                 f"compile it again")
+            raise ValueError(f"{path} is not a columnar video catalogue")
+        titles = _read_strings(catalogue_file)
+        video_ids = _read_strings(catalogue_file)
+        tag_table = [sys.intern(tag) for tag in _read_strings(catalogue_file)]
+        tag_set_offsets = _read_array(catalogue_file, "I")
+        tag_set_ids = _read_array(catalogue_file, "I")
+        row_tag_sets = _read_array(catalogue_file, "I")
+        title_order = _read_array(catalogue_file, "I")
+        posting_offsets = _read_array(catalogue_file, "I")
+        posting_ranks = _read_array(catalogue_file, "I")
+        grams = _read_strings(catalogue_file)
+        gram_offsets = _read_array(catalogue_file, "I")
+        gram_rows = _read_array(catalogue_file, "I")
+    if not (len(titles) == len(video_ids) == len(row_tag_sets)
+            == len(title_order) == count):
+        raise ValueError(f"{path} is a corrupt columnar video catalogue")
+
+    tag_sets = [tuple(map(tag_table.__getitem__, tag_ids))
+                for tag_ids in _sliced(tag_set_offsets, tag_set_ids)]
+    return ColumnarCatalogue(
+        titles,
+        video_ids,
+        tag_sets,
+        row_tag_sets,
+        title_order,
+        dict(zip(tag_table, _sliced(posting_offsets, posting_ranks))),
+        dict(zip(grams, _sliced(gram_offsets, gram_rows))),
+    )
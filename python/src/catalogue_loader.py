@@ -0,0 +1,84 @@
+"""A streaming loader for video catalogue files."""
+
+from .video import Video
+import os
+import sys
+
+CHUNK_SIZE = 10000
+
+
+class LoadStats:
+    """A class used to report the progress of a catalogue load."""
+    def __init__(self, total_bytes=0):
+        self.total_bytes = total_bytes
+        self.bytes_read = 0
+        self.rows = 0
+        self.skipped = 0
+
+    @property
+    def fraction_done(self):
+        if not self.total_bytes:
+            return 1.0
+        return self.bytes_read / self.total_bytes
+
+
+def parse_video(line: bytes):
+    """Parses one 'title | video_id | tag, tag' catalogue line.
+
+    Returns:
+        The Video, or None if the line is malformed.
+    """
+    try:
+        fields = line.decode("utf-8").split("|")
+    except UnicodeDecodeError:
+        return None
+    if len(fields) != 3:
+        return None
+    title, video_id, tags = (field.strip() for field in fields)
+    if not title or not video_id:
+        return None
+    return Video.from_interned(
+        title,
+        video_id,
+        tuple(sys.intern(tag.strip()) for tag in tags.split(",")) if tags else (),
+    )
+
+
+def iter_catalogue(path, chunk_size=CHUNK_SIZE, progress=None, stats=None):
+    """Reads a catalogue file lazily, yielding lists of up to chunk_size videos.
+
+    Only one chunk of parsed videos is held at a time. Blank lines are
+    ignored and malformed lines are skipped and counted.
+
+    Args:
+        path: The catalogue file to read.
+        chunk_size: The number of videos to yield at a time.
+        progress: Optional callable, called with the LoadStats after every
+            chunk.
+        stats: Optional LoadStats to fill in, e.g. to read the number of
+            skipped rows afterwards.
+    """
+    if stats is None:
+        stats = LoadStats()
+    stats.total_bytes = os.path.getsize(path)
+    chunk = []
+    with open(path, "rb") as video_file:
+        for line in video_file:
+            stats.bytes_read += len(line)
+            if not line.strip():
+                continue
+            video = parse_video(line)
+            if video is None:
+                stats.skipped += 1
+                continue
+            stats.rows += 1
+            chunk.append(video)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+                if progress is not None:
+                    progress(stats)
+    if chunk:
+        yield chunk
+    if progress is not None:
+        progress(stats)
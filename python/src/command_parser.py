@@ -1,7 +1,7 @@
 """A command parser class."""
 
-import textwrap
-from typing import Sequence
+import sys
+from typing import Callable, Optional, Sequence
 
 
 class CommandException(Exception):
@@ -9,155 +9,307 @@ class CommandException(Exception):
     pass
 
 
-class CommandParser:
-    """A class used to parse and execute a user Command."""
+class Command:
+    """A class used to describe a command the parser can execute.
 
-    def __init__(self, video_player):
-        self._player = video_player
+    Args:
+        name: The command name, matched case-insensitively.
+        handler: Called with the video player followed by the arguments.
+        min_args: The fewest arguments the command accepts.
+        max_args: The most arguments the command accepts, None for no limit.
+        usage: The message of the CommandException raised when the number
+            of arguments is wrong.
+        help_text: The line describing the command in HELP.
+        options: Names of the "--name <number>" options the command takes,
+            passed to the handler as keyword arguments. They may appear
+            anywhere after the command name and do not count as arguments.
+    """
 
-    def execute_command(self, command: Sequence[str]):
-        """Executes the user command. Expects the command to be upper case.
-           Raises CommandException if a command cannot be parsed.
-        """
-        if not command:
-            raise CommandException(
-                "Please enter a valid command, "
-                "type HELP for a list of available commands.")
+    def __init__(self, name: str, handler: Callable, min_args: int = 0,
+                 max_args: Optional[int] = 0, usage: str = "",
+                 help_text: str = "", options: Sequence[str] = ()):
+        self.name = name.upper()
+        self.handler = handler
+        self.min_args = min_args
+        self.max_args = max_args
+        self.usage = usage
+        self.help_text = help_text
+        self.options = tuple(options)
 
-        if command[0].upper() == "NUMBER_OF_VIDEOS":
-            self._player.number_of_videos()
+    def accepts(self, arg_count):
+        return (arg_count >= self.min_args
+                and (self.max_args is None or arg_count <= self.max_args))
 
-        elif command[0].upper() == "SHOW_ALL_VIDEOS":
-            self._player.show_all_videos()
+    def split_options(self, args):
+        """Separates the options from the arguments.
 
-        elif command[0].upper() == "PLAY":
-            if len(command) != 2:
+        Returns:
+            An (args, options) tuple, options maps option names to their
+            numbers.
+        Raises:
+            CommandException: If an option has no non-negative number, or
+                one above sys.maxsize.
+        """
+        if not self.options:
+            return args, {}
+        remaining = []
+        options = {}
+        words = iter(args)
+        for word in words:
+            name = word[2:].lower() if word.startswith("--") else None
+            if name not in self.options:
+                remaining.append(word)
+                continue
+            value = next(words, "")
+            if not value.isdecimal() or int(value) > sys.maxsize:
                 raise CommandException(
-                    "Please enter PLAY command followed by video_id.")
-            self._player.play_video(command[1])
+                    f"Please enter --{name} followed by a number.")
+            options[name] = int(value)
+        return remaining, options
 
-        elif command[0].upper() == "PLAY_RANDOM":
-            self._player.play_random_video()
 
-        elif command[0].upper() == "STOP":
-            self._player.stop_video()
+# The commands known to every parser, by name. Built once at import time.
+_COMMANDS = {}
 
-        elif command[0].upper() == "PAUSE":
-            self._player.pause_video()
 
-        elif command[0].upper() == "CONTINUE":
-            self._player.continue_video()
+def register_command(name, handler, min_args=0, max_args=0, usage="",
+                     help_text="", options=()):
+    """Registers a command with every CommandParser.
 
-        elif command[0].upper() == "SHOW_PLAYING":
-            self._player.show_playing()
+    Plugins use this to add commands without editing the parser. A command
+    registered under an existing name replaces it.
+    """
+    command = Command(name, handler, min_args, max_args, usage, help_text,
+                      options)
+    _COMMANDS[command.name] = command
+    return command
 
-        elif command[0].upper() == "CREATE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CREATE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.create_playlist(command[1])
 
-        elif command[0].upper() == "ADD_TO_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter ADD_TO_PLAYLIST command followed by a "
-                    "playlist name and video_id to add.")
-            self._player.add_to_playlist(command[1], command[2])
+def _play_random(player, count=None):
+    if count is None:
+        player.play_random_video()
+    elif count.isdecimal() and int(count) > 0:
+        player.play_random_video(int(count))
+    else:
+        raise CommandException(
+            "Please enter PLAY_RANDOM command followed by an "
+            "optional number of videos.")
 
-        elif command[0].upper() == "REMOVE_FROM_PLAYLIST":
-            if len(command) != 3:
-                raise CommandException(
-                    "Please enter REMOVE_FROM_PLAYLIST command followed by a "
-                    "playlist name and video_id to remove.")
-            self._player.remove_from_playlist(command[1], command[2])
 
-        elif command[0].upper() == "CLEAR_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter CLEAR_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.clear_playlist(command[1])
+def _add_to_playlist(player, playlist_name, *video_ids):
+    if len(video_ids) == 1:
+        player.add_to_playlist(playlist_name, video_ids[0])
+    else:
+        player.add_all_to_playlist(playlist_name, video_ids)
 
-        elif command[0].upper() == "DELETE_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter DELETE_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.delete_playlist(command[1])
 
-        elif command[0].upper() == "SHOW_PLAYLIST":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SHOW_PLAYLIST command followed by a "
-                    "playlist name.")
-            self._player.show_playlist(command[1])
+def _play_result(player, number):
+    if not number.isdecimal():
+        raise CommandException(
+            "Please enter PLAY_RESULT command followed by the number of a "
+            "search result.")
+    player.play_result(int(number))
 
-        elif command[0].upper() == "SHOW_ALL_PLAYLISTS":
-            self._player.show_all_playlists()
 
-        elif command[0].upper() == "SEARCH_VIDEOS":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS command followed by a "
-                    "search term.")
-            self._player.search_videos(command[1])
+def _flag_video(player, video_id, flag_reason=None):
+    if flag_reason is None:
+        player.flag_video(video_id)
+    else:
+        player.flag_video(video_id, flag_reason)
 
-        elif command[0].upper() == "SEARCH_VIDEOS_WITH_TAG":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
-                    "video tag.")
-            self._player.search_videos_tag(command[1])
-
-        elif command[0].upper() == "FLAG_VIDEO":
-            if len(command) == 3:
-                self._player.flag_video(command[1], command[2])
-            elif len(command) == 2:
-                self._player.flag_video(command[1])
-            else:
-                raise CommandException(
-                    "Please enter FLAG_VIDEO command followed by a "
-                    "video_id and an optional flag reason.")
 
-        elif command[0].upper() == "ALLOW_VIDEO":
-            if len(command) != 2:
-                raise CommandException(
-                    "Please enter ALLOW_VIDEO command followed by a "
-                    "video_id.")
-            self._player.allow_video(command[1])
+def _search(method_name):
+    """Returns the handler of a search command, calling the named method.
+
+    "--top k" asks for the first k results and is the same as "--limit k".
+    """
+    def handler(player, *terms, top=None, **page):
+        if top is not None:
+            page["limit"] = top
+        getattr(player, method_name)(" ".join(terms), **page)
+    return handler
+
+
+# Options of the commands that list videos one page at a time.
+_PAGE_OPTIONS = ("limit", "offset")
+_SEARCH_OPTIONS = _PAGE_OPTIONS + ("top",)
+
+# Commands without arguments have always ignored any extra words.
+register_command(
+    "NUMBER_OF_VIDEOS", lambda player, *_: player.number_of_videos(),
+    max_args=None,
+    help_text="NUMBER_OF_VIDEOS - Shows how many videos are in the library.")
+register_command(
+    "SHOW_ALL_VIDEOS",
+    lambda player, *_, **page: player.show_all_videos(**page),
+    max_args=None, options=_PAGE_OPTIONS,
+    help_text=("SHOW_ALL_VIDEOS [--limit <n>] [--offset <n>] - Lists all "
+               "videos from the library."))
+register_command(
+    "PLAY", lambda player, video_id: player.play_video(video_id),
+    min_args=1, max_args=1,
+    usage="Please enter PLAY command followed by video_id.",
+    help_text="PLAY <video_id> - Plays specified video.")
+register_command(
+    "PLAY_RANDOM", _play_random, max_args=1,
+    usage=("Please enter PLAY_RANDOM command followed by an "
+           "optional number of videos."),
+    help_text=("PLAY_RANDOM [<count>] - Plays a random video from the "
+               "library, queueing count - 1 more distinct ones."))
+register_command(
+    "NEXT", lambda player, *_: player.play_next_video(), max_args=None,
+    help_text="NEXT - Plays the next queued video.")
+register_command(
+    "STOP", lambda player, *_: player.stop_video(), max_args=None,
+    help_text="STOP - Stop the current video.")
+register_command(
+    "PAUSE", lambda player, *_: player.pause_video(), max_args=None,
+    help_text="PAUSE - Pause the current video.")
+register_command(
+    "CONTINUE", lambda player, *_: player.continue_video(), max_args=None,
+    help_text="CONTINUE - Resume the current paused video.")
+register_command(
+    "SHOW_PLAYING", lambda player, *_: player.show_playing(), max_args=None,
+    help_text=("SHOW_PLAYING - Displays the title, url and paused status of "
+               "the video that is currently playing (or paused)."))
+register_command(
+    "CREATE_PLAYLIST",
+    lambda player, playlist_name: player.create_playlist(playlist_name),
+    min_args=1, max_args=1,
+    usage=("Please enter CREATE_PLAYLIST command followed by a "
+           "playlist name."),
+    help_text=("CREATE_PLAYLIST <playlist_name> - Creates a new (empty) "
+               "playlist with the provided name."))
+register_command(
+    "ADD_TO_PLAYLIST", _add_to_playlist, min_args=2, max_args=None,
+    usage=("Please enter ADD_TO_PLAYLIST command followed by a "
+           "playlist name and video_id to add."),
+    help_text=("ADD_TO_PLAYLIST <playlist_name> <video_id> [<video_id> ...] "
+               "- Adds the requested video(s) to the playlist."))
+register_command(
+    "REMOVE_FROM_PLAYLIST",
+    lambda player, playlist_name, video_id: player.remove_from_playlist(
+        playlist_name, video_id),
+    min_args=2, max_args=2,
+    usage=("Please enter REMOVE_FROM_PLAYLIST command followed by a "
+           "playlist name and video_id to remove."),
+    help_text=("REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes "
+               "the specified video from the specified playlist"))
+register_command(
+    "CLEAR_PLAYLIST",
+    lambda player, playlist_name: player.clear_playlist(playlist_name),
+    min_args=1, max_args=1,
+    usage=("Please enter CLEAR_PLAYLIST command followed by a "
+           "playlist name."),
+    help_text=("CLEAR_PLAYLIST <playlist_name> - Removes all the videos "
+               "from the playlist."))
+register_command(
+    "DELETE_PLAYLIST",
+    lambda player, playlist_name: player.delete_playlist(playlist_name),
+    min_args=1, max_args=1,
+    usage=("Please enter DELETE_PLAYLIST command followed by a "
+           "playlist name."),
+    help_text="DELETE_PLAYLIST <playlist_name> - Deletes the playlist.")
+register_command(
+    "SHOW_PLAYLIST",
+    lambda player, playlist_name: player.show_playlist(playlist_name),
+    min_args=1, max_args=1,
+    usage=("Please enter SHOW_PLAYLIST command followed by a "
+           "playlist name."),
+    help_text=("SHOW_PLAYLIST <playlist_name> - List all the videos in "
+               "this playlist."))
+register_command(
+    "SHOW_ALL_PLAYLISTS", lambda player, *_: player.show_all_playlists(),
+    max_args=None,
+    help_text="SHOW_ALL_PLAYLISTS - Display all the available playlists.")
+register_command(
+    "SEARCH_VIDEOS",
+    _search("search_videos"),
+    min_args=1, max_args=1, options=_SEARCH_OPTIONS,
+    usage=("Please enter SEARCH_VIDEOS command followed by a "
+           "search term."),
+    help_text=("SEARCH_VIDEOS <search_term> [--top <k>] [--limit <n>] "
+               "[--offset <n>] - Display all the videos whose titles contain the "
+               "search_term."))
+register_command(
+    "SEARCH_VIDEOS_WITH_TAG",
+    _search("search_videos_tag"),
+    min_args=1, max_args=None, options=_SEARCH_OPTIONS,
+    usage=("Please enter SEARCH_VIDEOS_WITH_TAG command followed by a "
+           "video tag."),
+    help_text=("SEARCH_VIDEOS_WITH_TAG <tag_name> [--top <k>] "
+               "[--limit <n>] [--offset <n>] -Display all videos whose "
+               "tags contains the provided tag.\n"
+               "    Combine tags with \",\" (and), \"|\" (or) and \"-\" "
+               "(not), e.g. #cat,#animal -#dog"))
+register_command(
+    "PLAY_RESULT", _play_result, min_args=1, max_args=1,
+    usage=("Please enter PLAY_RESULT command followed by the number of a "
+           "search result."),
+    help_text=("PLAY_RESULT <number> - Plays a video from the last search "
+               "results."))
+register_command(
+    "FLAG_VIDEO", _flag_video, min_args=1, max_args=2,
+    usage=("Please enter FLAG_VIDEO command followed by a "
+           "video_id and an optional flag reason."),
+    help_text=("FLAG_VIDEO <video_id> <flag_reason> - Mark a video as "
+               "flagged."))
+register_command(
+    "ALLOW_VIDEO", lambda player, video_id: player.allow_video(video_id),
+    min_args=1, max_args=1,
+    usage=("Please enter ALLOW_VIDEO command followed by a "
+           "video_id."),
+    help_text="ALLOW_VIDEO <video_id> - Removes a flag from a video.")
+
+
+class CommandParser:
+    """A class used to parse and execute a user Command."""
+
+    def __init__(self, video_player):
+        self._player = video_player
+        # Shared with every parser until this one registers its own command.
+        self._commands = _COMMANDS
+
+    def register_command(self, name, handler, min_args=0, max_args=0,
+                         usage="", help_text="", options=()):
+        """Registers a command with this parser only."""
+        if self._commands is _COMMANDS:
+            self._commands = dict(_COMMANDS)
+        command = Command(name, handler, min_args, max_args, usage, help_text,
+                          options)
+        self._commands[command.name] = command
+        return command
+
+    def execute_command(self, command: Sequence[str]):
+        """Executes the user command. Expects the command to be upper case.
+           Raises CommandException if a command cannot be parsed.
+        """
+        if not command:
+            raise CommandException(
+                "Please enter a valid command, "
+                "type HELP for a list of available commands.")
 
-        elif command[0].upper() == "HELP":
+        name = command[0].upper()
+        if name == "HELP":
             self._get_help()
-        else:
-            print(
+            return
+        spec = self._commands.get(name)
+        if spec is None:
+            self._player.output(
                 "Please enter a valid command, type HELP for a list of "
                 "available commands.")
+            return
+        args, options = spec.split_options(command[1:])
+        if not spec.accepts(len(args)):
+            raise CommandException(spec.usage)
+        spec.handler(self._player, *args, **options)
 
     def _get_help(self):
         """Displays all available commands to the user."""
-        help_text = textwrap.dedent("""
-        Available commands:
-            NUMBER_OF_VIDEOS - Shows how many videos are in the library.
-            SHOW_ALL_VIDEOS - Lists all videos from the library.
-            PLAY <video_id> - Plays specified video.
-            PLAY_RANDOM - Plays a random video from the library.
-            STOP - Stop the current video.
-            PAUSE - Pause the current video.
-            CONTINUE - Resume the current paused video.
-            SHOW_PLAYING - Displays the title, url and paused status of the video that is currently playing (or paused).
-            CREATE_PLAYLIST <playlist_name> - Creates a new (empty) playlist with the provided name.
-            ADD_TO_PLAYLIST <playlist_name> <video_id> - Adds the requested video to the playlist.
-            REMOVE_FROM_PLAYLIST <playlist_name> <video_id> - Removes the specified video from the specified playlist
-            CLEAR_PLAYLIST <playlist_name> - Removes all the videos from the playlist.
-            DELETE_PLAYLIST <playlist_name> - Deletes the playlist.
-            SHOW_PLAYLIST <playlist_name> - List all the videos in this playlist.
-            SHOW_ALL_PLAYLISTS - Display all the available playlists.
-            SEARCH_VIDEOS <search_term> - Display all the videos whose titles contain the search_term.
-            SEARCH_VIDEOS_WITH_TAG <tag_name> -Display all videos whose tags contains the provided tag.
-            FLAG_VIDEO <video_id> <flag_reason> - Mark a video as flagged.
-            ALLOW_VIDEO <video_id> - Removes a flag from a video.
-            HELP - Displays help.
-            EXIT - Terminates the program execution.
-        """)
-        print(help_text)
+        lines = ["", "Available commands:"]
+        for spec in self._commands.values():
+            lines.extend("    " + line for line in spec.help_text.splitlines())
+        lines.append("    HELP - Displays help.")
+        lines.append("    EXIT - Terminates the program execution.")
+        lines.append("")
+        self._player.output(*lines)
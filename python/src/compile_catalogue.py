@@ -0,0 +1,37 @@
+"""Compiles a text video catalogue into a format that loads faster.
+
+    python3 -m src.compile_catalogue videos.txt videos.col
+    python3 -m src.compile_catalogue --format sqlite videos.txt videos.db
+
+The formats are columnar (the default, see catalogue_format), mapped (see
+mapped_video_library) and sqlite (see sqlite_backend).
+"""
+import sys
+
+from .catalogue_format import compile_catalogue
+from .mapped_video_library import build_mapped_catalogue
+from .sqlite_backend import build_sqlite_catalogue
+
+FORMATS = {
+    "columnar": compile_catalogue,
+    "mapped": build_mapped_catalogue,
+    "sqlite": build_sqlite_catalogue,
+}
+
+
+def main(argv):
+    catalogue_format = "columnar"
+    if argv[:1] == ["--format"] and len(argv) > 1:
+        catalogue_format, argv = argv[1], argv[2:]
+    if len(argv) != 2 or catalogue_format not in FORMATS:
+        print("Usage: python3 -m src.compile_catalogue "
+              "[--format columnar|mapped|sqlite] <source> <target>")
+        return 2
+    source, target = argv
+    count = FORMATS[catalogue_format](source, target)
+    print(f"Compiled {count} videos from {source} into {target}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,182 @@
+"""A memory-mapped video library class."""
+
+from .catalogue_loader import iter_catalogue, parse_video
+from .tag_index import parse_query, query_matches
+from .video_library import BaseVideoLibrary
+from collections.abc import Sequence
+from array import array
+import mmap
+import struct
+
+MAGIC = b"YTMAP\x00v1"
+_HEADER = struct.Struct("=8sQ")
+
+
+def is_mapped_catalogue(path):
+    """Returns True if the file at path was written by build_mapped_catalogue."""
+    with open(path, "rb") as catalogue_file:
+        return catalogue_file.read(len(MAGIC)) == MAGIC
+
+
+def build_mapped_catalogue(source_path, target_path):
+    """Converts a videos.txt style catalogue into a memory-mappable file.
+
+    The file holds a header (magic, row count), the offset of every row
+    with the rows sorted by video id, the row numbers in title order and
+    then the rows themselves, in the same 'title | id | tags' text form as
+    the source. Offsets are stored as native unsigned 64 bit integers, so
+    the file is meant to be built on the machine that reads it.
+
+    Returns:
+        The number of videos written.
+    """
+    videos = {}
+    for chunk in iter_catalogue(source_path):
+        for video in chunk:
+            videos[video.video_id] = video
+    rows = sorted(videos.values(), key=lambda x: x.video_id)
+    title_order = array("Q", sorted(range(len(rows)),
+                                    key=lambda i: (rows[i].title,
+                                                   rows[i].video_id)))
+
+    encoded = [f"{video.title}|{video.video_id}|{','.join(video.tags)}\n"
+               .encode("utf-8") for video in rows]
+    offsets = array("Q")
+    position = (_HEADER.size + (len(rows) + 1) * offsets.itemsize
+                + len(rows) * title_order.itemsize)
+    for row in encoded:
+        offsets.append(position)
+        position += len(row)
+    offsets.append(position)
+
+    with open(target_path, "wb") as target_file:
+        target_file.write(_HEADER.pack(MAGIC, len(rows)))
+        target_file.write(offsets.tobytes())
+        target_file.write(title_order.tobytes())
+        for row in encoded:
+            target_file.write(row)
+    return len(rows)
+
+
+class MappedVideoView(Sequence):
+    """A read-only sequence of the videos in a MappedVideoLibrary.
+
+    Video objects are only created when an item is accessed.
+    """
+
+    def __init__(self, library, order=None):
+        self._library = library
+        self._order = order
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if self._order is not None:
+            index = self._order[index]
+        elif index < 0:
+            index += len(self)
+        return self._library._row(index)
+
+    def __len__(self):
+        return len(self._library)
+
+
+class MappedVideoLibrary(BaseVideoLibrary):
+    """A class used to represent a Video Library backed by a mapped file.
+
+    Start-up only maps the file built by build_mapped_catalogue, no row is
+    parsed until it is needed. Lookups by id binary search the sorted rows
+    and searches stream over the rows in title order, so resident memory
+    stays small at the cost of O(n) searches. The library is read-only.
+    """
+
+    def __init__(self, path):
+        """The MappedVideoLibrary class is initialized.
+
+        Args:
+            path: A catalogue file written by build_mapped_catalogue.
+        """
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count = _HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a mapped video catalogue")
+        self._count = count
+        start = _HEADER.size
+        end = start + (count + 1) * 8
+        self._offsets = memoryview(self._map)[start:end].cast("Q")
+        self._title_order = memoryview(self._map)[end:end + count * 8].cast("Q")
+        # The library never changes, so neither does its version.
+        super().__init__()
+
+    def close(self):
+        """Releases the mapped file."""
+        for view in ("_offsets", "_title_order"):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._map.close()
+        self._file.close()
+
+    def _row_bytes(self, row):
+        return self._map[self._offsets[row]:self._offsets[row + 1]]
+
+    def _row(self, row):
+        return parse_video(self._row_bytes(row))
+
+    def _row_id(self, row):
+        return self._row_bytes(row).split(b"|", 2)[1].decode("utf-8")
+
+    def __len__(self):
+        return self._count
+
+    def __iter__(self):
+        return (self._row(row) for row in range(self._count))
+
+    def videos(self):
+        """Returns a read-only sequence view of all videos, without copying."""
+        return MappedVideoView(self)
+
+    def get_videos_by_title(self):
+        """Returns a lazy sequence of all videos, in title order."""
+        return MappedVideoView(self, self._title_order)
+
+    def iter_videos_by_title(self, offset=0):
+        """Yields the videos of the library in title order.
+
+        Args:
+            offset: The number of videos to skip, skipped in O(1).
+        """
+        for index in range(offset, self._count):
+            yield self._row(self._title_order[index])
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._row_id(middle) < video_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self._count and self._row_id(low) == video_id:
+            return self._row(low)
+        return None
+
+    def _search_titles(self, term, limit):
+        """Reads the rows in title order, the search stops at the limit."""
+        return (video for video in self.iter_videos_by_title()
+                if term in video.title.casefold())
+
+    def _search_tags(self, query, limit):
+        parsed_query = parse_query(query)
+        return (video for video in self.iter_videos_by_title()
+                if query_matches(parsed_query, video.tags))
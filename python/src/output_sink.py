@@ -0,0 +1,80 @@
+"""Output sinks for the video player.
+
+A sink receives the lines a VideoPlayer outputs. Each write call gets all
+the lines of one message or listing, so a listing reaches the sink in one
+call however long it is.
+"""
+
+import sys
+import time
+
+
+class StdoutSink:
+    """A class used to write player output straight to stdout."""
+
+    def write(self, lines):
+        # Looked up on every call so that redirected stdout is honoured.
+        sys.stdout.write("".join(line + "\n" for line in lines))
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+class BufferedSink:
+    """A class used to buffer player output and write it in large blocks.
+
+    Args:
+        stream: Where the output goes, sys.stdout by default.
+        limit: The number of buffered characters that triggers a write.
+    """
+
+    def __init__(self, stream=None, limit=1 << 16):
+        self._stream = stream
+        self._limit = limit
+        self._parts = []
+        self._size = 0
+
+    def write(self, lines):
+        text = "".join(line + "\n" for line in lines)
+        self._parts.append(text)
+        self._size += len(text)
+        if self._size >= self._limit:
+            self.flush()
+
+    def flush(self):
+        stream = self._stream if self._stream is not None else sys.stdout
+        if self._parts:
+            stream.write("".join(self._parts))
+            self._parts = []
+            self._size = 0
+        stream.flush()
+
+
+class ListSink:
+    """A class used to collect player output lines in memory."""
+
+    def __init__(self):
+        self.lines = []
+
+    def write(self, lines):
+        self.lines.extend(lines)
+
+    def flush(self):
+        pass
+
+
+class EventSink:
+    """A class used to collect player output as structured events.
+
+    Every write becomes one event, a dict holding the time it was written
+    at and its lines.
+    """
+
+    def __init__(self):
+        self.events = []
+
+    def write(self, lines):
+        self.events.append({"time": time.time(), "lines": list(lines)})
+
+    def flush(self):
+        pass
@@ -0,0 +1,157 @@
+"""A catalogue loader that parses byte ranges of the file in parallel.
+
+The text catalogue is split into ranges of about the same size that start
+and end at line boundaries. A pool of worker processes parses each range,
+sorts its part of the title order and tag postings and builds its title
+trigram postings. The parent process only builds the Video objects and
+merges the parts, which sorting the concatenated runs and appending the
+trigram postings do in close to linear time.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import os
+
+from .catalogue_loader import LoadStats, parse_video
+from .title_index import TitleIndex
+
+
+class RangeIndex:
+    """A class used to hold the parsed rows of one range of a catalogue.
+
+    Rows are numbered from 0 in the order they appear in the range.
+
+    Attributes:
+        titles: The title of every row.
+        video_ids: The video id of every row.
+        tag_sets: The distinct tag tuples of the range.
+        tag_rows: The position in tag_sets of the tags of every row.
+        title_order: The rows in (title, video_id) order.
+        postings: Casefolded tag -> its rows in (title, video_id) order.
+        title_postings: Title trigram -> sorted array of its rows, as
+            returned by TitleIndex.postings.
+        skipped: The number of malformed lines.
+        size: The number of bytes in the range.
+    """
+
+    def __init__(self):
+        self.titles = []
+        self.video_ids = []
+        self.tag_sets = []
+        self.tag_rows = []
+        self.title_order = []
+        self.postings = {}
+        self.title_postings = {}
+        self.skipped = 0
+        self.size = 0
+
+
+def split_ranges(path, parts):
+    """Splits a file into at most parts ranges that end at line boundaries.
+
+    Returns:
+        A list of (start, end) byte offsets covering the whole file in
+        order. Ranges are never empty, so a small file gives fewer ranges.
+    """
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as catalogue:
+        for part in range(1, parts):
+            offset = size * part // parts
+            if offset <= boundaries[-1]:
+                continue
+            # Move on to the start of the next line.
+            catalogue.seek(offset - 1)
+            catalogue.readline()
+            offset = catalogue.tell()
+            if boundaries[-1] < offset < size:
+                boundaries.append(offset)
+    boundaries.append(size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:])
+            if start < end]
+
+
+def parse_range(path, start, end):
+    """Parses the lines between two byte offsets and indexes them.
+
+    Runs in a worker process. Blank lines are ignored and malformed lines
+    are skipped and counted, as iter_catalogue does.
+
+    Returns:
+        A RangeIndex.
+    """
+    with open(path, "rb") as catalogue:
+        catalogue.seek(start)
+        data = catalogue.read(end - start)
+    index = RangeIndex()
+    index.size = len(data)
+    titles, video_ids = index.titles, index.video_ids
+    tag_rows = index.tag_rows
+    tag_set_rows = {}
+    for line in data.split(b"\n"):
+        if not line.strip():
+            continue
+        video = parse_video(line)
+        if video is None:
+            index.skipped += 1
+            continue
+        titles.append(video.title)
+        video_ids.append(video.video_id)
+        tags = video.tags
+        tag_row = tag_set_rows.get(tags)
+        if tag_row is None:
+            tag_row = tag_set_rows[tags] = len(index.tag_sets)
+            index.tag_sets.append(tags)
+        tag_rows.append(tag_row)
+    index.title_order = sorted(range(len(titles)),
+                               key=lambda row: (titles[row], video_ids[row]))
+    # Each row is listed under a tag once, even if tagged with several
+    # spellings of it.
+    folded_sets = [{tag.casefold() for tag in tags}
+                   for tags in index.tag_sets]
+    postings = index.postings
+    for row in index.title_order:
+        for tag in folded_sets[tag_rows[row]]:
+            posting = postings.get(tag)
+            if posting is None:
+                postings[tag] = [row]
+            else:
+                posting.append(row)
+    title_index = TitleIndex()
+    title_index.add_all(video_ids, titles)
+    index.title_postings = title_index.postings()
+    return index
+
+
+def parse_parallel(path, workers, progress=None, stats=None):
+    """Parses a text catalogue in worker processes.
+
+    Args:
+        path: The catalogue file to read.
+        workers: The number of worker processes, and of ranges the file is
+            split into.
+        progress: Optional callable, called with the LoadStats after every
+            range.
+        stats: Optional LoadStats to fill in.
+
+    Yields:
+        The RangeIndex of every range, in file order.
+    """
+    if stats is None:
+        stats = LoadStats()
+    stats.total_bytes = os.path.getsize(path)
+    ranges = split_ranges(path, workers)
+    if not ranges:
+        if progress is not None:
+            progress(stats)
+        return
+    starts = [start for start, _ in ranges]
+    ends = [end for _, end in ranges]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as pool:
+        for index in pool.map(parse_range, [path] * len(ranges), starts,
+                              ends):
+            stats.bytes_read += index.size
+            stats.rows += len(index.titles)
+            stats.skipped += index.skipped
+            if progress is not None:
+                progress(stats)
+            yield index
@@ -1,11 +1,14 @@
 """A playback manager class."""
 
+from collections import deque
+
 
 class PlaybackManager:
     """A class used to represent a playback manager"""
     def __init__(self):
         self.current_video = None
         self.is_paused = None
+        self.queue = deque()
 
     def video_is_playing(self, video):
         self.current_video = video
@@ -17,3 +20,12 @@ class PlaybackManager:
     def video_stopped(self):
         self.current_video = None
         self.is_paused = None
+
+    def video_queued(self, video):
+        self.queue.append(video)
+
+    def queue_cleared(self):
+        self.queue.clear()
+
+    def next_queued_video(self):
+        return self.queue.popleft() if self.queue else None
@@ -0,0 +1,201 @@
+"""Persistent playlist storage with an append-only journal.
+
+Every change to the playlists is appended to a log file as one JSON line:
+
+    {"op": "create", "name": "My List"}
+    {"op": "add", "name": "My List", "video_ids": ["id1", "id2"]}
+    {"op": "remove", "name": "My List", "video_id": "id1"}
+    {"op": "clear", "name": "My List"}
+    {"op": "delete", "name": "My List"}
+
+Every so often the whole store is written to a snapshot file instead and
+the log is started afresh, so loading costs one snapshot read plus a
+bounded number of log entries however long the history is. The snapshot
+and the log both carry a generation number. A log older than the snapshot,
+left behind by a crash during compaction, is ignored. An entry cut short by
+a crash is dropped from the log when it is loaded, so later entries are
+appended after the last complete one.
+"""
+
+import json
+import os
+import threading
+
+from .video_playlist import Playlist
+
+# Appended entries are synced to disk after this many writes.
+SYNC_EVERY = 32
+# The log is compacted into a snapshot after this many entries.
+COMPACT_EVERY = 1000
+
+
+class PlaylistJournal:
+    """A class used to persist a Playlist store.
+
+    Args:
+        path: The log file. The snapshot is kept next to it, in
+            path + ".snapshot".
+        sync_every: The number of entries written between fsyncs. Entries
+            not synced yet may be lost if the machine crashes.
+        compact_every: The number of log entries that triggers compaction.
+    """
+
+    def __init__(self, path, sync_every=SYNC_EVERY,
+                 compact_every=COMPACT_EVERY):
+        self.path = os.fspath(path)
+        self.snapshot_path = self.path + ".snapshot"
+        self.sync_every = sync_every
+        self.compact_every = compact_every
+        self._store = None
+        self._log = None
+        self._generation = 0
+        self._entries = 0
+        self._unsynced = 0
+        # Stores shared between threads record from several of them.
+        self._lock = threading.RLock()
+
+    def load(self, store=None):
+        """Replays the snapshot and the log into a store and starts recording.
+
+        Args:
+            store: An empty Playlist, a new one if None.
+
+        Returns:
+            The store, whose changes are now appended to the log.
+        """
+        if store is None:
+            store = Playlist()
+        self._generation = self._load_snapshot(store)
+        log_generation, entries, size = self._read_log()
+        if log_generation == self._generation:
+            for entry in entries:
+                _apply(store, entry)
+            self._entries = len(entries)
+            os.truncate(self.path, size)
+            self._log = open(self.path, "a", encoding="utf-8")
+        else:
+            self._entries = 0
+            self._start_log()
+        self._store = store
+        store.journal = self
+        return store
+
+    def _load_snapshot(self, store):
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as snapshot:
+                data = json.load(snapshot)
+        except FileNotFoundError:
+            return 0
+        for name, video_ids in data["playlists"]:
+            store.add_playlist(name)
+            store.add_videos(name, video_ids)
+        return data["generation"]
+
+    def _read_log(self):
+        """Returns the generation of the log, its entries and their size.
+
+        The size is the number of bytes up to the end of the last complete
+        entry.
+        """
+        try:
+            with open(self.path, "rb") as log:
+                lines = log.read().split(b"\n")
+        except FileNotFoundError:
+            return None, [], 0
+        entries = []
+        size = 0
+        # The last entry may have been cut short by a crash, before or
+        # after its newline, so only the lines ended by one are read.
+        for line in lines[:-1]:
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                break
+            size += len(line) + 1
+        if not entries or "generation" not in entries[0]:
+            return None, [], 0
+        return entries[0]["generation"], entries[1:], size
+
+    def _start_log(self):
+        """Replaces the log by an empty one of the current generation."""
+        if self._log is not None:
+            self._log.close()
+        self._log = open(self.path, "w", encoding="utf-8")
+        self._log.write(json.dumps({"generation": self._generation}) + "\n")
+        self.sync()
+
+    def record(self, op, name, **fields):
+        """Appends one change to the log. Called by the store."""
+        with self._lock:
+            entry = {"op": op, "name": name, **fields}
+            self._log.write(json.dumps(entry) + "\n")
+            self._entries += 1
+            self._unsynced += 1
+            if self._entries >= self.compact_every:
+                self.compact()
+            elif self._unsynced >= self.sync_every:
+                self.sync()
+
+    def sync(self):
+        """Writes every entry recorded so far to disk."""
+        with self._lock:
+            self._log.flush()
+            os.fsync(self._log.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Writes the store to a new snapshot and empties the log."""
+        with self._lock:
+            self._generation += 1
+            data = {
+                "generation": self._generation,
+                "playlists": [
+                    [playlist.name, list(playlist.videos)]
+                    for playlist in list(self._store.playlists.values())],
+            }
+            temporary_path = self.snapshot_path + ".tmp"
+            with open(temporary_path, "w", encoding="utf-8") as snapshot:
+                json.dump(data, snapshot)
+                snapshot.flush()
+                os.fsync(snapshot.fileno())
+            os.replace(temporary_path, self.snapshot_path)
+            self._entries = 0
+            self._start_log()
+
+    def close(self):
+        """Syncs the log and stops recording changes."""
+        with self._lock:
+            if self._log is None:
+                return
+            self.sync()
+            self._log.close()
+            self._log = None
+            if self._store is not None:
+                self._store.journal = None
+                self._store = None
+
+
+def _apply(store, entry):
+    op, name = entry.get("op"), entry.get("name")
+    if op == "create":
+        store.add_playlist(name)
+    elif op == "add":
+        store.add_videos(name, entry["video_ids"])
+    elif op == "remove":
+        store.remove_video(name, entry["video_id"])
+    elif op == "clear":
+        store.clear_playlist(name)
+    elif op == "delete":
+        store.delete_playlist(name)
+
+
+def open_playlists(path, store=None, **options):
+    """Returns a Playlist store loaded from, and saved to, a journal at path.
+
+    Args:
+        path: The log file of the journal.
+        store: The empty store to load into, e.g. a ConcurrentPlaylist. A
+            new Playlist if None.
+        options: Passed to PlaylistJournal.
+    """
+    return PlaylistJournal(path, **options).load(store)
@@ -0,0 +1,133 @@
+"""A search result cache class."""
+
+from collections import OrderedDict
+import itertools
+import threading
+import time
+
+# Searches finding more videos than this are not stored.
+MAX_RESULTS = 1000
+
+
+class QueryCache:
+    """A class used to keep the results of recent searches.
+
+    Results are stored under a normalised query together with the version
+    of the library they were computed from, and are only returned while the
+    library still has that version. The least recently used entries are
+    dropped beyond size entries, and entries older than ttl seconds are not
+    returned.
+
+    A search bounded by a limit stores only its first results. They also
+    answer later searches for the same query with a smaller limit, and for
+    any limit once they turn out to be every match. No entry holds more
+    than max_results videos, so the cache stays small however large the
+    library is.
+
+    The cache may be shared between threads.
+
+    Args:
+        size: The most queries to keep.
+        ttl: The seconds an entry stays valid for, None for no expiry.
+        clock: Returns the current time in seconds.
+        max_results: The most videos an entry holds.
+    """
+
+    def __init__(self, size=256, ttl=None, clock=time.monotonic,
+                 max_results=MAX_RESULTS):
+        self.size = size
+        self.ttl = ttl
+        self.max_results = max_results
+        self._clock = clock
+        # query -> (version, time stored, limit, videos)
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Drops every entry, the counters are kept."""
+        with self._lock:
+            self._entries.clear()
+
+    def get(self, query, version, limit=None):
+        """Returns the cached videos of a search, None on a miss.
+
+        Args:
+            query: The normalised query.
+            version: The current version of the library.
+            limit: The most videos wanted, all of them if None.
+        """
+        with self._lock:
+            entry = self._entries.get(query)
+            if entry is not None:
+                stored_version, stored_at, stored_limit, videos = entry
+                if (stored_version != version
+                        or (self.ttl is not None
+                            and self._clock() - stored_at > self.ttl)):
+                    del self._entries[query]
+                elif (stored_limit is None or len(videos) < stored_limit
+                        or (limit is not None and limit <= stored_limit)):
+                    self._entries.move_to_end(query)
+                    self.hits += 1
+                    return videos if limit is None else videos[:limit]
+            self.misses += 1
+            return None
+
+    def put(self, query, version, limit, videos):
+        """Stores the videos found by a search.
+
+        Args:
+            query: The normalised query.
+            version: The version of the library searched.
+            limit: The limit the search was bounded by, None if it was not.
+            videos: The videos found, as a list.
+        """
+        with self._lock:
+            self._entries[query] = (version, self._clock(), limit, videos)
+            self._entries.move_to_end(query)
+            if len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def fetch(self, query, version, limit, search):
+        """Returns the videos of a search, running it only on a miss.
+
+        A bounded search is run to a list of at most limit videos. An
+        unbounded search stays lazy: its videos are passed through as they
+        are found, and only stored if they are iterated to the end. Either
+        is stored only if it found at most max_results videos.
+
+        Args:
+            query: The normalised query.
+            version: The current version of the library.
+            limit: The most videos wanted, all of them if None.
+            search: Called with limit on a miss, returns an iterable over
+                the matching videos in order.
+
+        Returns:
+            An iterable over the videos.
+        """
+        videos = self.get(query, version, limit)
+        if videos is not None:
+            return videos
+        if limit is None:
+            return self._pass_through(query, version, search(None))
+        videos = list(itertools.islice(search(limit), limit))
+        if len(videos) <= self.max_results:
+            self.put(query, version, limit, videos)
+        return videos
+
+    def _pass_through(self, query, version, videos):
+        """Yields videos, storing them once they run out, if few enough."""
+        found = []
+        for video in videos:
+            if found is not None:
+                found.append(video)
+                if len(found) > self.max_results:
+                    found = None
+            yield video
+        if found is not None:
+            self.put(query, version, None, found)
@@ -1,13 +1,39 @@
-"""A youtube terminal simulator."""
+"""A youtube terminal simulator.
+
+Run without arguments for the interactive prompt. Commands can also be
+replayed from a file, or from stdin when it is not a terminal:
+
+    python3 -m src.run --script session.txt --timings timings.tsv
+    cat session.txt | python3 -m src.run
+
+Playlists are kept for the next run with --playlists playlists.log. The
+catalogue and its backend are chosen with --catalogue and --backend, see
+backends.
+"""
+import argparse
+import sys
+import time
+
+from .backends import BACKENDS, library_playlists, open_library
+from .playlist_journal import open_playlists
 from .video_player import VideoPlayer
 from .command_parser import CommandException
 from .command_parser import CommandParser
+from .output_sink import BufferedSink
 
+WELCOME = """Hello and welcome to YouTube, what would you like to do?
+    Enter HELP for list of available commands or EXIT to terminate."""
+GOODBYE = ("YouTube has now terminated its execution. "
+           "Thank you and goodbye!")
 
-if __name__ == "__main__":
-    print("""Hello and welcome to YouTube, what would you like to do?
-    Enter HELP for list of available commands or EXIT to terminate.""")
-    video_player = VideoPlayer()
+# Buffered batch output is written out once it grows past this many
+# characters.
+FLUSH_SIZE = 1 << 16
+
+
+def run_interactive(video_library=None, playlists=None):
+    print(WELCOME)
+    video_player = VideoPlayer(video_library, playlists=playlists)
     parser = CommandParser(video_player)
     while True:
         command = input("YT> ")
@@ -17,5 +43,117 @@ if __name__ == "__main__":
             parser.execute_command(command.split())
         except CommandException as e:
             print(e)
-    print("YouTube has now terminated its execution. "
-          "Thank you and goodbye!")
+    print(GOODBYE)
+
+
+def run_script(lines, output=None, timings=None, video_library=None,
+               playlists=None):
+    """Executes commands read from lines, as the interactive loop would.
+
+    The output is the same as the interactive loop's without the "YT> "
+    prompts. It is buffered and written in large blocks. Questions asked by
+    a command, such as which search result to play, are answered by the
+    next line.
+
+    Args:
+        lines: An iterable of command lines, e.g. an open file.
+        output: Where the output goes, sys.stdout by default.
+        timings: Optional file that receives a "seconds<TAB>command" line
+            for every command executed.
+        video_library: The library to play from, videos.txt if None.
+        playlists: The Playlist store to use, a new empty one if None.
+
+    Returns:
+        The number of commands executed.
+    """
+    if output is None:
+        output = sys.stdout
+    lines = iter(lines)
+
+    def answer(prompt):
+        output.write(prompt)
+        return next(lines, "").rstrip("\n")
+
+    sink = BufferedSink(output, FLUSH_SIZE)
+    executed = 0
+    try:
+        sink.write([WELCOME])
+        parser = CommandParser(VideoPlayer(video_library, output=sink,
+                                           ask=answer, playlists=playlists))
+        for line in lines:
+            command = line.strip()
+            if command.upper() == "EXIT":
+                break
+            start = time.perf_counter()
+            try:
+                parser.execute_command(command.split())
+            except CommandException as e:
+                sink.write([str(e)])
+            executed += 1
+            if timings is not None:
+                timings.write(
+                    f"{time.perf_counter() - start:.6f}\t{command}\n")
+        sink.write([GOODBYE])
+    finally:
+        # Whatever the commands before a failure printed is still shown.
+        sink.flush()
+    return executed
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument(
+        "--script", help="file of commands to execute, - for stdin")
+    arg_parser.add_argument(
+        "--timings", help="file that receives per-command timings")
+    arg_parser.add_argument(
+        "--playlists", help="journal file the playlists are kept in")
+    arg_parser.add_argument(
+        "--catalogue", help="catalogue file to load, videos.txt by default")
+    arg_parser.add_argument(
+        "--backend", choices=sorted(BACKENDS),
+        help="video library backend, detected from the catalogue by default")
+    args = arg_parser.parse_args(argv)
+
+    video_library = None
+    if args.catalogue or args.backend:
+        try:
+            video_library = open_library(args.catalogue, args.backend)
+        except (OSError, ValueError) as error:
+            arg_parser.error(str(error))
+    playlists = open_playlists(args.playlists) if args.playlists else None
+    if playlists is None and video_library is not None:
+        playlists = library_playlists(video_library)
+    try:
+        if args.script is None and sys.stdin.isatty():
+            run_interactive(video_library, playlists)
+            return
+        _run_batch(args, video_library, playlists)
+    finally:
+        if playlists is not None and getattr(playlists, "journal", None):
+            playlists.journal.close()
+
+
+def _run_batch(args, video_library, playlists):
+    timings = open(args.timings, "w") if args.timings else None
+    try:
+        if args.script in (None, "-"):
+            start = time.perf_counter()
+            executed = run_script(sys.stdin, timings=timings,
+                                  video_library=video_library,
+                                  playlists=playlists)
+        else:
+            with open(args.script) as script:
+                start = time.perf_counter()
+                executed = run_script(script, timings=timings,
+                                      video_library=video_library,
+                                      playlists=playlists)
+    finally:
+        if timings is not None:
+            timings.close()
+    elapsed = time.perf_counter() - start
+    print(f"Executed {executed} commands in {elapsed:.3f} s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+"""A search results class."""
+
+
+class SearchResults:
+    """A class used to represent one page of search results.
+
+    The results are numbered from offset + 1, as they are displayed.
+    """
+
+    def __init__(self, query, videos, offset=0):
+        self.query = query
+        self.videos = list(videos)
+        self.offset = offset
+
+    def __len__(self):
+        return len(self.videos)
+
+    def __iter__(self):
+        return iter(self.videos)
+
+    def numbered(self):
+        """Yields (number, video) pairs, numbered as they are displayed."""
+        return enumerate(self.videos, self.offset + 1)
+
+    def get(self, number):
+        """Returns the video with the displayed number, None if not on the page."""
+        index = number - 1 - self.offset
+        if 0 <= index < len(self.videos):
+            return self.videos[index]
+        return None
@@ -0,0 +1,150 @@
+"""A network front-end for the youtube terminal simulator.
+
+Serves the same line-oriented commands as run.py over TCP or a Unix
+socket, with a session of its own for every connection:
+
+    python3 -m src.server --port 8000
+    python3 -m src.server --unix /tmp/youtube.sock --catalogue videos.db
+
+The server greets a new connection like the interactive prompt does, and
+follows the output of every command with the "YT> " prompt, so a client
+knows where a response ends. Clients may pipeline commands, i.e. send
+several without waiting for their responses, which are sent back in
+order. Searches do not ask which result to play, PLAY_RESULT <number>
+plays one instead. EXIT ends the connection.
+
+Backpressure applies both ways. A connection that sends faster than its
+commands are executed fills the reader buffer, and reading stops until
+it drains. Executing stops while a slow client has more than the write
+buffer high-water mark of responses unread.
+"""
+
+import argparse
+import asyncio
+import itertools
+
+from .backends import BACKENDS, open_library
+from .command_parser import CommandException
+from .output_sink import ListSink
+from .run import GOODBYE, WELCOME
+from .session_manager import SessionManager
+
+PROMPT = "YT> "
+# The longest command line accepted, a longer one closes the connection.
+LINE_LIMIT = 1 << 16
+# Connections waiting to be accepted. Clients connecting in a burst beyond
+# it back off for seconds before retrying.
+BACKLOG = 4096
+
+
+class CommandServer:
+    """A class used to serve player sessions to network connections.
+
+    Args:
+        sessions: The SessionManager the sessions are opened with.
+    """
+
+    def __init__(self, sessions):
+        self.sessions = sessions
+        self._connection_ids = itertools.count(1)
+
+    def _execute(self, session, sink, line):
+        """Executes one command line, returns its output and whether to stop.
+
+        Args:
+            session: The Session of the connection.
+            sink: The ListSink the session's player writes to.
+            line: The command line.
+        """
+        command = line.strip()
+        if command.upper() == "EXIT":
+            return GOODBYE + "\n", True
+        try:
+            session.parser.execute_command(command.split())
+        except CommandException as e:
+            session.player.output(str(e))
+        text = "".join(output + "\n" for output in sink.lines)
+        sink.lines.clear()
+        return text + PROMPT, False
+
+    async def handle_connection(self, reader, writer):
+        """Serves one connection until it sends EXIT or closes."""
+        user_id = f"connection-{next(self._connection_ids)}"
+        sink = ListSink()
+        session = self.sessions.open_session(
+            user_id, output=sink, interactive=False)
+        try:
+            writer.write((WELCOME + "\n" + PROMPT).encode("utf-8"))
+            await writer.drain()
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Longer than LINE_LIMIT.
+                    break
+                if not line:
+                    break
+                text, stop = self._execute(
+                    session, sink, line.decode("utf-8", "replace"))
+                writer.write(text.encode("utf-8"))
+                await writer.drain()
+                if stop:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.close_session(user_id)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def start(self, host="127.0.0.1", port=0, path=None):
+        """Starts listening, on a Unix socket if path is given.
+
+        Returns:
+            The asyncio Server.
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(
+                self.handle_connection, path, limit=LINE_LIMIT,
+                backlog=BACKLOG)
+        return await asyncio.start_server(
+            self.handle_connection, host, port, limit=LINE_LIMIT,
+            backlog=BACKLOG)
+
+
+async def serve(sessions, host="127.0.0.1", port=0, path=None):
+    """Serves sessions until cancelled."""
+    server = await CommandServer(sessions).start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8000)
+    arg_parser.add_argument("--unix", help="Unix socket to listen on instead")
+    arg_parser.add_argument(
+        "--catalogue",
+        help="catalogue file to load, videos.txt by default")
+    arg_parser.add_argument(
+        "--backend", choices=sorted(BACKENDS),
+        help="video library backend, detected from the catalogue by default")
+    args = arg_parser.parse_args(argv)
+
+    try:
+        video_library = open_library(args.catalogue, args.backend)
+    except (OSError, ValueError) as error:
+        arg_parser.error(str(error))
+    sessions = SessionManager(video_library)
+    try:
+        asyncio.run(serve(sessions, args.host, args.port, args.unix))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
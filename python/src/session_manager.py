@@ -0,0 +1,89 @@
+"""A session manager class."""
+
+from collections import OrderedDict
+
+from .command_parser import CommandParser
+from .video_library import VideoLibrary
+from .video_player import VideoPlayer
+
+
+class Session:
+    """A class used to represent one user's session.
+
+    Each session has its own player, and so its own playback state, queue,
+    playlists and search results, while the video library is shared.
+    """
+
+    def __init__(self, user_id, player):
+        self.user_id = user_id
+        self.player = player
+        self.parser = CommandParser(player)
+
+
+class SessionManager:
+    """A class used to serve many users from one shared video library.
+
+    The library is loaded once and only read by the sessions, so an extra
+    user costs the memory of their own state. The rendered video strings
+    are cached once for all sessions as well.
+    """
+
+    def __init__(self, video_library=None, playlists=None):
+        """The SessionManager class is initialized.
+
+        Args:
+            video_library: The library shared by every session. A
+                VideoLibrary over the bundled videos.txt is loaded if none
+                is given.
+            playlists: Optional callable, called with a user id and
+                returning the Playlist store of that user. Every session
+                starts with an empty store if None.
+        """
+        if video_library is None:
+            video_library = VideoLibrary()
+        self.video_library = video_library
+        self._playlists = playlists
+        self._display_cache = OrderedDict()
+        self._sessions = {}
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, user_id):
+        return user_id in self._sessions
+
+    def open_session(self, user_id, **player_options):
+        """Returns the session of a user, opening it if needed.
+
+        Args:
+            user_id: Identifies the user.
+            player_options: Passed to the VideoPlayer of a new session, e.g.
+                output or interactive.
+        """
+        session = self._sessions.get(user_id)
+        if session is None:
+            if self._playlists is not None:
+                player_options.setdefault("playlists", self._playlists(user_id))
+            player = VideoPlayer(self.video_library,
+                                 display_cache=self._display_cache,
+                                 **player_options)
+            session = self._sessions[user_id] = Session(user_id, player)
+        return session
+
+    def get_session(self, user_id):
+        """Returns the session of a user, None if it is not open."""
+        return self._sessions.get(user_id)
+
+    def close_session(self, user_id):
+        """Closes the session of a user, and the journal of its playlists.
+
+        Returns:
+            True, or False if the session was not open.
+        """
+        session = self._sessions.pop(user_id, None)
+        if session is None:
+            return False
+        journal = getattr(session.player.all_playlists, "journal", None)
+        if journal is not None:
+            journal.close()
+        return True
@@ -0,0 +1,431 @@
+"""A video library and playlist store kept in a SQLite database.
+
+The database holds the catalogue in indexed tables, so only the rows a
+command needs are read and catalogues much larger than memory can be
+served:
+
+    videos           id, video_id (unique), title, casefolded title and
+                     tags, indexed by (title, video_id) for title order
+    video_tags       (casefolded tag, video) pairs, the tag posting lists
+    video_titles     an FTS5 trigram index over the casefolded titles
+    playlists, playlist_videos
+                     the playlists and their videos, in the order added
+
+Build a database from a text catalogue with build_sqlite_catalogue or
+
+    python3 -m src.compile_catalogue --format sqlite videos.txt videos.db
+
+Queries take their values as placeholders. Most are constant SQL strings,
+which the sqlite3 module prepares once and reuses from its statement
+cache. Tag searches are the exception: their SQL is built from the shape
+of the query, its groups of tags and the number of tags in each, so one
+statement is prepared per shape and they share the cache.
+"""
+
+import random
+import sqlite3
+
+from .catalogue_loader import iter_catalogue
+from .tag_index import parse_query
+from .video import Video
+from .video_library import BaseVideoLibrary, VideoView
+from .video_playlist import PlaylistEntry
+
+MAGIC = b"SQLite format 3\x00"
+
+# Terms shorter than a trigram cannot use the full text index.
+_TRIGRAM = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    video_id TEXT NOT NULL UNIQUE,
+    title TEXT NOT NULL,
+    title_folded TEXT NOT NULL,
+    tags TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_by_title ON videos (title, video_id);
+CREATE TABLE IF NOT EXISTS video_tags (
+    tag TEXT NOT NULL,
+    video INTEGER NOT NULL,
+    PRIMARY KEY (tag, video)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS video_tags_by_video ON video_tags (video);
+CREATE VIRTUAL TABLE IF NOT EXISTS video_titles USING fts5 (
+    title_folded, content='videos', content_rowid='id', tokenize='trigram'
+);
+CREATE TABLE IF NOT EXISTS playlists (
+    name_folded TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS playlist_videos (
+    playlist TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    video_id TEXT NOT NULL,
+    PRIMARY KEY (playlist, video_id)
+);
+CREATE INDEX IF NOT EXISTS playlist_videos_in_order
+    ON playlist_videos (playlist, position);
+"""
+
+_COLUMNS = "title, video_id, tags"
+_INSERT_VIDEO = ("INSERT INTO videos (video_id, title, title_folded, tags) "
+                 "VALUES (?, ?, ?, ?)")
+_INSERT_TITLE = "INSERT INTO video_titles (rowid, title_folded) VALUES (?, ?)"
+_DELETE_TITLE = ("INSERT INTO video_titles (video_titles, rowid, title_folded) "
+                 "VALUES ('delete', ?, ?)")
+_INSERT_TAG = "INSERT OR IGNORE INTO video_tags (tag, video) VALUES (?, ?)"
+
+
+def is_sqlite_catalogue(path):
+    """Returns True if the file at path is a SQLite database."""
+    with open(path, "rb") as catalogue_file:
+        return catalogue_file.read(len(MAGIC)) == MAGIC
+
+
+def _connect(database):
+    if isinstance(database, sqlite3.Connection):
+        return database
+    connection = sqlite3.connect(database)
+    try:
+        connection.executescript(_SCHEMA)
+    except sqlite3.DatabaseError:
+        connection.close()
+        raise ValueError(f"{database} is not a SQLite database") from None
+    return connection
+
+
+def _video(row):
+    title, video_id, tags = row
+    return Video(title, video_id, tags.split(",") if tags else ())
+
+
+class SqliteVideoLibrary(BaseVideoLibrary):
+    """A class used to represent a Video Library kept in a SQLite database.
+
+    Lookups, title order and searches are answered by the database indexes,
+    so start-up reads nothing and resident memory does not grow with the
+    catalogue.
+    """
+
+    def __init__(self, database):
+        """The SqliteVideoLibrary class is initialized.
+
+        Args:
+            database: The database file, created if it does not exist, or
+                an open sqlite3 connection.
+        """
+        super().__init__()
+        self.connection = _connect(database)
+
+    def close(self):
+        self.connection.close()
+
+    def _rows(self, sql, parameters=()):
+        return map(_video, self.connection.execute(sql, parameters))
+
+    def _insert(self, video):
+        folded = video.title.casefold()
+        cursor = self.connection.execute(_INSERT_VIDEO, (
+            video.video_id, video.title, folded, ",".join(video.tags)))
+        row_id = cursor.lastrowid
+        self.connection.executemany(
+            _INSERT_TAG, ((tag.casefold(), row_id) for tag in video.tags))
+        return row_id, folded
+
+    def _delete(self, video_id):
+        row = self.connection.execute(
+            "SELECT id, title_folded FROM videos WHERE video_id = ?",
+            (video_id,)).fetchone()
+        if row is None:
+            return False
+        self.connection.execute(_DELETE_TITLE, row)
+        self.connection.execute("DELETE FROM video_tags WHERE video = ?",
+                                row[:1])
+        self.connection.execute("DELETE FROM videos WHERE id = ?", row[:1])
+        return True
+
+    def load_catalogue(self, path):
+        """Adds the videos of a text catalogue in a single transaction.
+
+        Later rows replace earlier rows, and videos already in the
+        database, with the same video id. The full text index is rebuilt
+        once at the end rather than updated row by row.
+
+        Returns:
+            The number of rows read.
+        """
+        rows = 0
+        with self.connection:
+            for chunk in iter_catalogue(path):
+                for video in chunk:
+                    # Only the full text index entry is left behind, and
+                    # it is rebuilt below.
+                    self.connection.execute(
+                        "DELETE FROM video_tags WHERE video = "
+                        "(SELECT id FROM videos WHERE video_id = ?)",
+                        (video.video_id,))
+                    self.connection.execute(
+                        "DELETE FROM videos WHERE video_id = ?",
+                        (video.video_id,))
+                    self._insert(video)
+                rows += len(chunk)
+            self.connection.execute(
+                "INSERT INTO video_titles (video_titles) VALUES ('rebuild')")
+        self.version += 1
+        return rows
+
+    def add_video(self, video):
+        """Adds a new video to the library and every index.
+
+        Returns:
+            True, or False if a video with the same id is already in the
+            library.
+        """
+        with self.connection:
+            if self.get_video(video.video_id) is not None:
+                return False
+            self.connection.execute(_INSERT_TITLE, self._insert(video))
+        self.version += 1
+        return True
+
+    def remove_video(self, video_id):
+        """Removes a video from the library and every index.
+
+        Returns:
+            True, or False if the video does not exist.
+        """
+        with self.connection:
+            if not self._delete(video_id):
+                return False
+        self.version += 1
+        return True
+
+    def update_video(self, video):
+        """Replaces the video with the same id, e.g. to change its title or tags.
+
+        Returns:
+            True, or False if the video does not exist.
+        """
+        with self.connection:
+            if not self._delete(video.video_id):
+                return False
+            self.connection.execute(_INSERT_TITLE, self._insert(video))
+        self.version += 1
+        return True
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT count(*) FROM videos").fetchone()[0]
+
+    def __iter__(self):
+        return self._rows(f"SELECT {_COLUMNS} FROM videos ORDER BY id")
+
+    def videos(self):
+        """Returns a read-only sequence of all videos.
+
+        Unlike VideoLibrary.videos, the sequence is a copy.
+        """
+        return VideoView(self.snapshot())
+
+    def get_videos_by_title(self):
+        """Returns all videos from the video library, in title order."""
+        return list(self.iter_videos_by_title())
+
+    def iter_videos_by_title(self, offset=0):
+        """Yields the videos of the library in title order.
+
+        Args:
+            offset: The number of videos to skip.
+        """
+        return self._rows(
+            f"SELECT {_COLUMNS} FROM videos ORDER BY title, video_id "
+            "LIMIT -1 OFFSET ?", (offset,))
+
+    def get_video(self, video_id):
+        """Returns the video object (title, url, tags) from the video library.
+
+        Args:
+            video_id: The video url.
+
+        Returns:
+            The Video object for the requested video_id. None if the video
+            does not exist.
+        """
+        return next(self._rows(
+            f"SELECT {_COLUMNS} FROM videos WHERE video_id = ?",
+            (video_id,)), None)
+
+    def random_videos(self, count=1, exclude=()):
+        """Returns up to count distinct videos chosen uniformly at random.
+
+        Rows are drawn by random id and ids left unused by removed rows are
+        drawn again, so every video stays equally likely.
+
+        Args:
+            count: The number of videos to pick.
+            exclude: Video ids that must not be picked.
+        """
+        exclude = set(exclude)
+        excluded = sum(1 for video_id in exclude
+                       if self.get_video(video_id) is not None)
+        count = min(count, len(self) - excluded)
+        largest = self.connection.execute(
+            "SELECT max(id) FROM videos").fetchone()[0]
+        picks = {}
+        while len(picks) < count:
+            video = next(self._rows(
+                f"SELECT {_COLUMNS} FROM videos WHERE id = ?",
+                (random.randint(1, largest),)), None)
+            if video is not None and video.video_id not in exclude:
+                picks.setdefault(video.video_id, video)
+        return list(picks.values())
+
+    def _search_titles(self, term, limit):
+        """Looks terms of three characters or more up in the trigram index.
+        Shorter terms are checked against the titles in title order,
+        stopping at the limit."""
+        limit = -1 if limit is None else limit
+        if len(term) < _TRIGRAM:
+            return self._rows(
+                f"SELECT {_COLUMNS} FROM videos "
+                "WHERE instr(title_folded, ?) ORDER BY title, video_id "
+                "LIMIT ?", (term, limit))
+        # The trigram tokenizer folds case its own way, so the match is
+        # confirmed against the casefolded title.
+        phrase = '"' + term.replace('"', '""') + '"'
+        return self._rows(
+            f"SELECT {_COLUMNS} FROM videos WHERE id IN "
+            "(SELECT rowid FROM video_titles WHERE video_titles MATCH ?) "
+            "AND instr(title_folded, ?) ORDER BY title, video_id LIMIT ?",
+            (phrase, term, limit))
+
+    def _search_tags(self, query, limit):
+        groups, excluded = parse_query(query)
+        if not groups:
+            return iter(())
+        clauses = []
+        parameters = []
+        for tags, operator in ([(group, "IN") for group in groups]
+                               + [(excluded, "NOT IN")] * bool(excluded)):
+            placeholders = ", ".join("?" * len(tags))
+            clauses.append(f"id {operator} (SELECT video FROM video_tags "
+                           f"WHERE tag IN ({placeholders}))")
+            parameters.extend(tags)
+        parameters.append(-1 if limit is None else limit)
+        return self._rows(
+            f"SELECT {_COLUMNS} FROM videos WHERE {' AND '.join(clauses)} "
+            "ORDER BY title, video_id LIMIT ?", parameters)
+
+
+class SqlitePlaylist:
+    """A class used to represent a Playlist store kept in a SQLite database.
+
+    It has the same interface as Playlist. Playlists are keyed by their
+    casefolded name and get returns a PlaylistEntry read from the database.
+    """
+
+    def __init__(self, database):
+        """The SqlitePlaylist class is initialized.
+
+        Args:
+            database: The database file, created if it does not exist, or
+                an open sqlite3 connection, e.g. the one of a
+                SqliteVideoLibrary.
+        """
+        self.connection = _connect(database)
+
+    @staticmethod
+    def _key(playlist_name):
+        return playlist_name.casefold()
+
+    def _changes(self, sql, parameters):
+        with self.connection:
+            return self.connection.execute(sql, parameters).rowcount
+
+    def __len__(self):
+        return self.connection.execute(
+            "SELECT count(*) FROM playlists").fetchone()[0]
+
+    def exists(self, playlist_name):
+        return self.connection.execute(
+            "SELECT 1 FROM playlists WHERE name_folded = ?",
+            (self._key(playlist_name),)).fetchone() is not None
+
+    def get(self, playlist_name):
+        """Returns the PlaylistEntry for the name, or None if it does not exist."""
+        key = self._key(playlist_name)
+        row = self.connection.execute(
+            "SELECT name FROM playlists WHERE name_folded = ?",
+            (key,)).fetchone()
+        if row is None:
+            return None
+        playlist = PlaylistEntry(row[0])
+        playlist.videos = dict.fromkeys(video_id for video_id, in (
+            self.connection.execute(
+                "SELECT video_id FROM playlist_videos WHERE playlist = ? "
+                "ORDER BY position", (key,))))
+        return playlist
+
+    def names(self):
+        """Returns the display names of all playlists in sorted order."""
+        return [name for name, in self.connection.execute(
+            "SELECT name FROM playlists ORDER BY name")]
+
+    def add_playlist(self, playlist_name: str):
+        return bool(self._changes(
+            "INSERT OR IGNORE INTO playlists (name_folded, name) "
+            "VALUES (?, ?)", (self._key(playlist_name), playlist_name)))
+
+    def add_video(self, playlist_name, video_id):
+        return self.add_videos(playlist_name, [video_id]) == 1
+
+    def add_videos(self, playlist_name, video_ids):
+        """Adds every video id not already in the playlist, returns how many were added."""
+        key = self._key(playlist_name)
+        with self.connection:
+            if not self.exists(playlist_name):
+                return 0
+            before = self.connection.total_changes
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO playlist_videos "
+                "(playlist, position, video_id) "
+                "SELECT ?, coalesce(max(position), 0) + 1, ? "
+                "FROM playlist_videos WHERE playlist = ?",
+                ((key, video_id, key) for video_id in video_ids))
+            return self.connection.total_changes - before
+
+    def remove_video(self, playlist_name, video_id):
+        return bool(self._changes(
+            "DELETE FROM playlist_videos WHERE playlist = ? AND video_id = ?",
+            (self._key(playlist_name), video_id)))
+
+    def clear_playlist(self, playlist_name):
+        if not self.exists(playlist_name):
+            return False
+        self._changes("DELETE FROM playlist_videos WHERE playlist = ?",
+                      (self._key(playlist_name),))
+        return True
+
+    def delete_playlist(self, playlist_name):
+        key = self._key(playlist_name)
+        with self.connection:
+            self.connection.execute(
+                "DELETE FROM playlist_videos WHERE playlist = ?", (key,))
+            return bool(self.connection.execute(
+                "DELETE FROM playlists WHERE name_folded = ?",
+                (key,)).rowcount)
+
+
+def build_sqlite_catalogue(source_path, target_path):
+    """Loads a videos.txt style catalogue into a SQLite database.
+
+    Returns:
+        The number of videos in the database.
+    """
+    library = SqliteVideoLibrary(target_path)
+    try:
+        library.load_catalogue(source_path)
+        return len(library)
+    finally:
+        library.close()
@@ -0,0 +1,230 @@
+"""A tag index class."""
+
+import bisect
+import heapq
+import re
+
+
+def _contains(posting, key):
+    """Returns True if the sorted list posting holds key."""
+    index = bisect.bisect_left(posting, key)
+    return index < len(posting) and posting[index] == key
+
+
+def _union(postings):
+    """Returns the keys present in any of the sorted lists, in order."""
+    matches = []
+    for key in heapq.merge(*postings):
+        if not matches or matches[-1] != key:
+            matches.append(key)
+    return matches
+
+
+def parse_query(query):
+    """Splits a tag query into its required and excluded tags.
+
+    Returns:
+        A (required, excluded) tuple. required is a list of groups of
+        casefolded tags, at least one tag of every group must match.
+        excluded is a list of casefolded tags none of which may match.
+    """
+    required = []
+    excluded = []
+    for term in re.split(r"[\s,]+", query.strip()):
+        if not term:
+            continue
+        if term.startswith("-") and len(term) > 1:
+            excluded.append(term[1:].casefold())
+        else:
+            group = [tag.casefold() for tag in term.split("|") if tag]
+            if group:
+                required.append(group)
+    return required, excluded
+
+
+def query_key(query):
+    """Returns a hashable form of a tag query, equal for equivalent queries.
+
+    Queries that only differ by case, order, separators or repeated tags
+    have the same key.
+    """
+    required, excluded = parse_query(query)
+    return (frozenset(map(frozenset, required)), frozenset(excluded))
+
+
+def query_matches(parsed_query, tags):
+    """Returns True if a video with the given tags matches the tag query.
+
+    Args:
+        parsed_query: A query as returned by parse_query.
+        tags: The tags of the video.
+    """
+    required, excluded = parsed_query
+    folded = {tag.casefold() for tag in tags}
+    return (bool(required)
+            and all(not folded.isdisjoint(group) for group in required)
+            and folded.isdisjoint(excluded))
+
+
+class TagIndex:
+    """A class used to find videos by their tags.
+
+    Each casefolded tag maps to a posting list of (title, video_id) keys
+    kept in sorted order, so the videos of a tag come back in title order
+    and several tags can be combined by merging their posting lists.
+
+    Queries are made of tags separated by whitespace or commas, all of
+    which must match. A tag prefixed with "-" must not match, and tags
+    joined with "|" match if any of them does, for example
+    "#cat,#animal -#dog" or "#cat|#dog -#google".
+    """
+
+    def __init__(self):
+        self._postings = {}
+        # Tag -> (keys, ranks) pairs given to add_ranked_postings whose
+        # keys have not been looked up yet.
+        self._ranked = {}
+
+    @staticmethod
+    def _entry(video):
+        return (video.title, video.video_id), {tag.casefold()
+                                               for tag in video.tags}
+
+    def add(self, video):
+        """Indexes the tags of a video that is not in the index yet."""
+        key, folded = self._entry(video)
+        for tag in folded:
+            self._load(tag)
+            bisect.insort(self._postings.setdefault(tag, []), key)
+
+    def add_all(self, videos, sort=True):
+        """Indexes the tags of many new videos, sorting each posting once.
+
+        With sort=False the postings are left unsorted until sort is called.
+        """
+        postings = self._postings
+        touched = set()
+        for video in videos:
+            key, folded = self._entry(video)
+            for tag in folded:
+                if self._ranked:
+                    self._load(tag)
+                posting = postings.get(tag)
+                if posting is None:
+                    postings[tag] = [key]
+                else:
+                    posting.append(key)
+            touched.update(folded)
+        if sort:
+            for tag in touched:
+                postings[tag].sort()
+
+    def sort(self):
+        """Restores the order of every posting list."""
+        for posting in self._postings.values():
+            posting.sort()
+
+    def add_postings(self, postings):
+        """Indexes prebuilt posting lists of videos not in the index yet.
+
+        Args:
+            postings: A mapping of tag to (title, video_id) keys in sorted
+                order. Tags that only differ by case are merged.
+        """
+        touched = set()
+        for tag, keys in postings.items():
+            folded = tag.casefold()
+            self._load(folded)
+            if folded in self._postings:
+                self._postings[folded].extend(keys)
+                touched.add(folded)
+            else:
+                self._postings[folded] = list(keys)
+        for tag in touched:
+            posting = self._postings[tag]
+            posting.sort()
+            # A video tagged with two spellings of the same tag is listed
+            # twice after merging.
+            posting[:] = _union([posting])
+
+    def add_ranked_postings(self, postings, keys):
+        """Indexes prebuilt posting lists given as positions in keys.
+
+        The keys of a posting are only looked up when it is first used, so
+        a compiled catalogue loads without building every posting list.
+
+        Args:
+            postings: A mapping of tag to positions in keys, in increasing
+                order. Tags that only differ by case are merged.
+            keys: The (title, video_id) keys of the videos in sorted order,
+                a sequence that must not change afterwards.
+        """
+        for tag, ranks in postings.items():
+            self._ranked.setdefault(tag.casefold(), []).append((keys, ranks))
+
+    def _load(self, tag):
+        """Builds a posting list left by add_ranked_postings, if any.
+
+        The list is stored before it is dropped from _ranked, so a reader
+        on another thread always finds one of the two.
+        """
+        pairs = self._ranked.get(tag)
+        if pairs is None:
+            return
+        postings = [[keys[rank] for rank in ranks] for keys, ranks in pairs]
+        # A video tagged with two spellings of the same tag is in both.
+        posting = postings[0] if len(postings) == 1 else _union(postings)
+        self._postings.setdefault(tag, posting)
+        self._ranked.pop(tag, None)
+
+    def remove(self, video):
+        """Drops a video, as it was indexed, from the index."""
+        key, folded = self._entry(video)
+        for tag in folded:
+            self._load(tag)
+            posting = self._postings.get(tag)
+            if posting is None:
+                continue
+            index = bisect.bisect_left(posting, key)
+            if index < len(posting) and posting[index] == key:
+                del posting[index]
+            if not posting:
+                del self._postings[tag]
+
+    def _posting(self, tag):
+        self._load(tag)
+        return self._postings.get(tag, [])
+
+    def search(self, query, limit=None):
+        """Returns the ids of the videos matching the query, in title order.
+
+        The shortest required posting list drives the search and every
+        other posting list is probed by binary search, so the search stops
+        as soon as limit matches are found.
+
+        Args:
+            query: One or more tags, see the class docstring for the syntax.
+            limit: The most ids to return, all of them if None.
+        """
+        groups, excluded_tags = parse_query(query)
+        if not groups or limit == 0:
+            return []
+        required = [self._posting(group[0]) if len(group) == 1
+                    else _union(self._posting(tag) for tag in group)
+                    for group in groups]
+        excluded = [posting for posting in map(self._posting, excluded_tags)
+                    if posting]
+
+        required.sort(key=len)
+        driver, others = required[0], required[1:]
+        if not others and not excluded:
+            return [video_id for _, video_id in driver[:limit]]
+        matches = []
+        for key in driver:
+            if (all(_contains(posting, key) for posting in others)
+                    and not any(_contains(posting, key)
+                                for posting in excluded)):
+                matches.append(key[1])
+                if len(matches) == limit:
+                    break
+        return matches
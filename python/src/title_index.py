@@ -0,0 +1,156 @@
+"""A title index class."""
+
+from array import array
+import bisect
+
+
+def _grams(folded, size):
+    """Returns the set of substrings of folded of the given size."""
+    return set(map("".join, zip(*(folded[start:]
+                                  for start in range(size)))))
+
+
+class TitleIndex:
+    """A class used to find the videos whose titles contain a search term.
+
+    Every casefolded title is broken into its trigrams, and each trigram
+    maps to a sorted array of the slots of the videos that contain it. A
+    term of GRAM_SIZE characters or more is answered from the shortest
+    posting among its trigrams, checking the title of every candidate.
+    Shorter terms would match most titles anyway and are checked against
+    every title, callers wanting them in title order are better off
+    scanning the titles in that order.
+
+    Every video added gets the next slot, so postings stay sorted by
+    appending. Slots freed by removals are reclaimed by rebuilding the
+    index once they make up half of it.
+    """
+    GRAM_SIZE = 3
+    # Postings hold unsigned 32 bit slots.
+    TYPECODE = "I"
+
+    def __init__(self):
+        self._postings = {}
+        # The video id and title of every slot, None once removed.
+        self._video_ids = []
+        self._titles = []
+        self._size = 0
+        # Video id -> slot, None until needed after add_postings.
+        self._slots = {}
+
+    def __len__(self):
+        return self._size
+
+    def _slot_map(self):
+        if self._slots is None:
+            self._slots = {video_id: slot
+                           for slot, video_id in enumerate(self._video_ids)
+                           if video_id is not None}
+        return self._slots
+
+    def add(self, video_id, title):
+        """Indexes the title of a video, replacing any previous title."""
+        if video_id in self._slot_map():
+            self.remove(video_id)
+        self.add_all([video_id], [title])
+
+    def add_all(self, video_ids, titles):
+        """Indexes the titles of many videos that are not in the index yet.
+
+        Args:
+            video_ids: The ids of the videos.
+            titles: Their titles, in the same order.
+        """
+        postings = self._postings
+        slot = len(self._video_ids)
+        self._video_ids.extend(video_ids)
+        self._titles.extend(titles)
+        self._size += len(self._video_ids) - slot
+        if self._slots is not None:
+            self._slots.update(zip(self._video_ids[slot:], range(
+                slot, len(self._video_ids))))
+        for title in self._titles[slot:]:
+            for gram in _grams(title.casefold(), self.GRAM_SIZE):
+                posting = postings.get(gram)
+                if posting is None:
+                    postings[gram] = array(self.TYPECODE, (slot,))
+                else:
+                    posting.append(slot)
+            slot += 1
+
+    def add_postings(self, video_ids, titles, postings):
+        """Indexes the titles of many new videos from prebuilt postings.
+
+        Args:
+            video_ids: The ids of the videos.
+            titles: Their titles, in the same order.
+            postings: Trigram -> sorted array of the positions in video_ids
+                of the titles containing it, e.g. as written by
+                catalogue_format.
+        """
+        slot = len(self._video_ids)
+        self._video_ids.extend(video_ids)
+        self._titles.extend(titles)
+        self._size += len(self._video_ids) - slot
+        # Only removals need the slots of ids, they are found then.
+        self._slots = None
+        for gram, rows in postings.items():
+            if slot:
+                rows = array(self.TYPECODE, map(slot.__add__, rows))
+            posting = self._postings.get(gram)
+            if posting is None:
+                self._postings[gram] = rows
+            else:
+                posting.extend(rows)
+
+    def postings(self):
+        """Returns the postings, trigram -> sorted array of slots.
+
+        The slots of an index filled by one add_all call are the positions
+        of the videos in it.
+        """
+        return self._postings
+
+    def remove(self, video_id):
+        """Drops a video from the index. Unknown ids are ignored."""
+        slot = self._slot_map().pop(video_id, None)
+        if slot is None:
+            return
+        self._size -= 1
+        for gram in _grams(self._titles[slot].casefold(), self.GRAM_SIZE):
+            posting = self._postings[gram]
+            del posting[bisect.bisect_left(posting, slot)]
+            if not posting:
+                del self._postings[gram]
+        self._video_ids[slot] = self._titles[slot] = None
+        if self._size * 2 < len(self._video_ids):
+            self._rebuild()
+
+    def _rebuild(self):
+        video_ids = [video_id for video_id in self._video_ids
+                     if video_id is not None]
+        titles = [title for title in self._titles if title is not None]
+        self._postings = {}
+        self._video_ids, self._titles, self._slots = [], [], {}
+        self._size = 0
+        self.add_all(video_ids, titles)
+
+    def search(self, search_term):
+        """Returns the set of video ids whose titles contain search_term."""
+        term = search_term.casefold()
+        video_ids, titles = self._video_ids, self._titles
+        if len(term) < self.GRAM_SIZE:
+            return {video_id for video_id, title in zip(video_ids, titles)
+                    if video_id is not None and term in title.casefold()}
+
+        shortest = None
+        for gram in _grams(term, self.GRAM_SIZE):
+            posting = self._postings.get(gram)
+            if posting is None:
+                return set()
+            if shortest is None or len(posting) < len(shortest):
+                shortest = posting
+        if len(term) == self.GRAM_SIZE:
+            return {video_ids[slot] for slot in shortest}
+        return {video_ids[slot] for slot in shortest
+                if term in titles[slot].casefold()}
@@ -1,19 +1,39 @@
 """A video class."""
 
+import sys
 from typing import Sequence
 
 
 class Video:
     """A class used to represent a Video."""
 
+    # No per-instance __dict__, catalogues hold millions of these.
+    __slots__ = ("_title", "_video_id", "_tags")
+
     def __init__(self, video_title: str, video_id: str, video_tags: Sequence[str]):
         """Video constructor."""
         self._title = video_title
         self._video_id = video_id
 
         # Turn the tags into a tuple here so it's unmodifiable,
-        # in case the caller changes the 'video_tags' they passed to us
-        self._tags = tuple(video_tags)
+        # in case the caller changes the 'video_tags' they passed to us.
+        # Tags repeat across many videos, so every video shares one
+        # interned copy of each tag string.
+        self._tags = tuple(map(sys.intern, video_tags))
+
+    @classmethod
+    def from_interned(cls, video_title: str, video_id: str,
+                      video_tags: tuple):
+        """Returns a Video whose tags are a tuple of interned strings already.
+
+        The catalogue loaders intern every distinct tag once and use this
+        to skip interning it again for each video.
+        """
+        video = cls.__new__(cls)
+        video._title = video_title
+        video._video_id = video_id
+        video._tags = video_tags
+        return video
 
     @property
     def title(self) -> str:
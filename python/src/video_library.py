@@ -1,36 +1,500 @@
 """A video library class."""
 
+from .catalogue_format import is_columnar_catalogue, read_columnar_catalogue
+from .catalogue_loader import CHUNK_SIZE, LoadStats, iter_catalogue
+from .parallel_loader import parse_parallel
+from .query_cache import QueryCache
 from .video import Video
+from .tag_index import TagIndex, query_key
+from .title_index import TitleIndex
+from collections.abc import Sequence
 from pathlib import Path
-import csv
+import bisect
+import gc
+import heapq
+import itertools
+import random
+import sys
 
+DEFAULT_CATALOGUE = Path(__file__).parent / "videos.txt"
 
-# Helper Wrapper around CSV reader to strip whitespace from around
-# each item.
-def _csv_reader_with_strip(reader):
-    yield from ((item.strip() for item in line) for line in reader)
 
+class VideoView(Sequence):
+    """A read-only sequence view of the videos in a Video Library."""
 
-class VideoLibrary:
-    """A class used to represent a Video Library."""
+    def __init__(self, videos):
+        self._videos = videos
+
+    def __getitem__(self, index):
+        return self._videos[index]
+
+    def __len__(self):
+        return len(self._videos)
+
+
+class _ColumnarVideoList:
+    """The video list of a library loaded from a compiled catalogue.
+
+    The Video at a position is only created from the columns of the
+    catalogue when the position is first read. Positions written by the
+    library hold their Video already, the others still hold the row of the
+    same number.
+    """
+
+    def __init__(self, catalogue):
+        self._catalogue = catalogue
+        self._videos = [None] * len(catalogue.titles)
+
+    def __len__(self):
+        return len(self._videos)
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(len(self)))]
+        if position < 0:
+            position += len(self._videos)
+        video = self._videos[position]
+        if video is None:
+            video = self._videos[position] = self._catalogue.video(position)
+        return video
+
+    def __setitem__(self, position, video):
+        self._videos[position] = video
+
+    def __iter__(self):
+        return map(self.__getitem__, range(len(self._videos)))
+
+    def append(self, video):
+        self._videos.append(video)
+
+    def pop(self):
+        video = self[-1]
+        self._videos.pop()
+        return video
+
+
+class _ColumnarTitleOrder(Sequence):
+    """The (title, video_id) keys of a compiled catalogue in title order,
+    created as they are read."""
+
+    def __init__(self, catalogue):
+        self._catalogue = catalogue
+
+    def __len__(self):
+        return len(self._catalogue.title_order)
+
+    def __getitem__(self, rank):
+        if isinstance(rank, slice):
+            return [self[i] for i in range(*rank.indices(len(self)))]
+        row = self._catalogue.title_order[rank]
+        return self._catalogue.titles[row], self._catalogue.video_ids[row]
+
+    def __iter__(self):
+        catalogue = self._catalogue
+        return zip(map(catalogue.titles.__getitem__, catalogue.title_order),
+                   map(catalogue.video_ids.__getitem__,
+                       catalogue.title_order))
+
+
+class BaseVideoLibrary:
+    """A class holding the interface shared by the video library backends.
+
+    A backend provides __len__, __iter__, videos, get_video,
+    get_videos_by_title and iter_videos_by_title, and answers searches in
+    _search_titles and _search_tags. The searches are cached here in
+    query_cache, so a backend bumps version whenever its videos change.
+    """
 
     def __init__(self):
-        """The VideoLibrary class is initialized."""
-        self._videos = {}
-        with open(Path(__file__).parent / "videos.txt") as video_file:
-            reader = _csv_reader_with_strip(
-                csv.reader(video_file, delimiter="|"))
-            for video_info in reader:
-                title, url, tags = video_info
-                self._videos[url] = Video(
-                    title,
-                    url,
-                    [tag.strip() for tag in tags.split(",")] if tags else [],
-                )
+        # Bumped on every change to the videos, so that cached search
+        # results computed before it are not used.
+        self.version = 0
+        self.query_cache = QueryCache()
+
+    def snapshot(self):
+        """Returns a new list holding all videos in the library."""
+        return list(self)
 
     def get_all_videos(self):
         """Returns all available video information from the video library."""
-        return list(self._videos.values())
+        return self.snapshot()
+
+    def random_videos(self, count=1, exclude=()):
+        """Returns up to count distinct videos chosen uniformly at random.
+
+        Positions of the videos sequence are drawn at random, skipping
+        those drawn before, so the library is only read and searches can
+        run at the same time. It costs O(count) draws plus one per excluded
+        video hit while count is small next to the library, and never
+        copies it.
+
+        Args:
+            count: The number of videos to pick.
+            exclude: Video ids that must not be picked.
+
+        Returns:
+            A list of Video objects, shorter than count if the library does
+            not hold enough videos outside of exclude.
+        """
+        videos = self.videos()
+        size = len(videos)
+        picks = []
+        drawn = set()
+        while len(picks) < count and len(drawn) < size:
+            index = random.randrange(size)
+            if index in drawn:
+                continue
+            drawn.add(index)
+            video = videos[index]
+            if video.video_id not in exclude:
+                picks.append(video)
+        return picks
+
+    def random_video(self, exclude=()):
+        """Returns a video chosen uniformly at random, None if there is none.
+
+        Args:
+            exclude: Video ids that must not be picked.
+        """
+        picks = self.random_videos(1, exclude)
+        return picks[0] if picks else None
+
+    def search_titles(self, search_term, limit=None):
+        """Returns the videos whose titles contain search_term, in title order.
+
+        Args:
+            search_term: The (case insensitive) text to look for.
+            limit: The most videos to return, all of them if None.
+        """
+        return list(itertools.islice(
+            self.iter_search_titles(search_term, limit), limit))
+
+    def iter_search_titles(self, search_term, limit=None):
+        """Yields the videos whose titles contain search_term, in title order.
+
+        Args:
+            search_term: The (case insensitive) text to look for.
+            limit: Optional bound on the number of videos that will be
+                consumed, which the search may stop at.
+        """
+        term = search_term.casefold()
+        return iter(self.query_cache.fetch(
+            ("title", term), self.version, limit,
+            lambda limit: self._search_titles(term, limit)))
+
+    def search_tags(self, query, limit=None):
+        """Returns the videos matching a tag query, in title order.
+
+        Args:
+            query: One or more (case insensitive) tags. Tags separated by
+                whitespace or commas must all match, tags prefixed with "-"
+                must not match and tags joined with "|" are alternatives.
+            limit: The most videos to return, all of them if None.
+        """
+        return list(itertools.islice(
+            self.iter_search_tags(query, limit), limit))
+
+    def iter_search_tags(self, query, limit=None):
+        """Yields the videos matching a tag query, in title order.
+
+        Args:
+            query: One or more (case insensitive) tags, as for search_tags.
+            limit: Optional bound on the number of videos that will be
+                consumed, the search stops once it has found that many.
+        """
+        return iter(self.query_cache.fetch(
+            ("tags", query_key(query)), self.version, limit,
+            lambda limit: self._search_tags(query, limit)))
+
+    def _search_titles(self, term, limit):
+        """Returns an iterable over the videos whose titles contain a
+        casefolded term, in title order. The search may stop after limit
+        videos, or go on if limit is None."""
+        raise NotImplementedError
+
+    def _search_tags(self, query, limit):
+        """Returns an iterable over the videos matching a tag query, in title
+        order. The search may stop after limit videos, or go on if limit is
+        None."""
+        raise NotImplementedError
+
+
+class VideoLibrary(BaseVideoLibrary):
+    """A class used to represent a Video Library."""
+
+    def __init__(self, path=DEFAULT_CATALOGUE, progress=None,
+                 chunk_size=CHUNK_SIZE, workers=1):
+        """The VideoLibrary class is initialized.
+
+        Args:
+            path: The catalogue file to load, videos.txt by default. Both
+                the text format and catalogues compiled with
+                compile_catalogue are accepted.
+            progress: Optional callable, called with a LoadStats as the
+                catalogue is read.
+            chunk_size: The number of rows parsed between progress reports.
+            workers: The number of processes a text catalogue is parsed
+                in. Above 1 the file is split into that many ranges, see
+                parallel_loader, and progress is reported once per range.
+        """
+        # The videos as a list, for random access through VideoView and
+        # sampling, with the position of each video id in it.
+        self._video_list = []
+        self._positions = {}
+        # (title, video_id) of every video, kept sorted on insert and delete.
+        # A read-only sequence after loading a compiled catalogue, until
+        # the first change, see _thaw_title_order.
+        self._title_order = []
+        self._title_index = TitleIndex()
+        self._tag_index = TagIndex()
+        # False while a load leaves _title_order and the tag postings
+        # unsorted, see _add_all.
+        self._indexes_sorted = True
+        super().__init__()
+        self.load_stats = LoadStats()
+        # Loading only allocates objects that stay alive, so the cyclic
+        # garbage collector would repeatedly scan them for nothing.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            if is_columnar_catalogue(path):
+                self._load_columnar(path, progress)
+            elif workers > 1:
+                self._load_parallel(path, progress, workers)
+            else:
+                for chunk in iter_catalogue(path, chunk_size, progress,
+                                            self.load_stats):
+                    self._add_all(chunk, sort=False)
+                self._sort_indexes()
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _load_columnar(self, path, progress):
+        """Loads a compiled catalogue, whose columns need no parsing.
+
+        Only the id positions are built up front. Videos, title keys and
+        tag posting lists are created from the columns as they are used.
+        """
+        catalogue = read_columnar_catalogue(path)
+        titles, video_ids = catalogue.titles, catalogue.video_ids
+        self._video_list = _ColumnarVideoList(catalogue)
+        self._positions = dict(zip(video_ids, range(len(video_ids))))
+        self._title_order = _ColumnarTitleOrder(catalogue)
+        self._tag_index.add_ranked_postings(catalogue.tag_postings,
+                                            _ColumnarTitleOrder(catalogue))
+        self._title_index.add_postings(video_ids, titles,
+                                       catalogue.title_postings)
+        self.load_stats.rows = len(self._video_list)
+        self.load_stats.total_bytes = self.load_stats.bytes_read = (
+            Path(path).stat().st_size)
+        if progress is not None:
+            progress(self.load_stats)
+
+    def _load_parallel(self, path, progress, workers):
+        """Loads a text catalogue parsed by worker processes.
+
+        Each range comes with its rows sorted by title and its tag and
+        title postings, so sorting the concatenation only merges them and
+        the title postings are appended with their rows shifted.
+        """
+        postings = {}
+        for index in parse_parallel(path, workers, progress,
+                                    self.load_stats):
+            offset = len(self._video_list)
+            # The tags were interned in the worker, not in this process.
+            tag_sets = [tuple(map(sys.intern, tags))
+                        for tags in index.tag_sets]
+            video_ids = index.video_ids
+            self._video_list.extend(map(
+                Video.from_interned, index.titles, video_ids,
+                [tag_sets[row] for row in index.tag_rows]))
+            self._positions.update(
+                zip(video_ids, range(offset, len(self._video_list))))
+            keys = list(zip(index.titles, video_ids))
+            self._title_order.extend([keys[row] for row in index.title_order])
+            self._title_index.add_postings(video_ids, index.titles,
+                                           index.title_postings)
+            for tag, rows in index.postings.items():
+                posting = postings.get(tag)
+                if posting is None:
+                    postings[tag] = [keys[row] for row in rows]
+                else:
+                    posting.extend([keys[row] for row in rows])
+        if len(self._positions) < len(self._video_list):
+            # A video id is repeated, and the later rows replace the
+            # earlier ones. Rare enough to redo the indexes the slow way.
+            videos = self._video_list
+            self._video_list, self._positions = [], {}
+            self._title_order = []
+            self._title_index = TitleIndex()
+            self._add_all(videos)
+            return
+        self._title_order.sort()
+        for posting in postings.values():
+            posting.sort()
+        self._tag_index.add_postings(postings)
+        self.version += 1
+
+    def _add(self, video):
+        """Stores a video and adds it to every index."""
+        self._remove(video.video_id)
+        self._positions[video.video_id] = len(self._video_list)
+        self._video_list.append(video)
+        self._thaw_title_order()
+        bisect.insort(self._title_order, (video.title, video.video_id))
+        self._title_index.add(video.video_id, video.title)
+        self._tag_index.add(video)
+        self.version += 1
+
+    def _add_all(self, videos, sort=True):
+        """Stores many videos at once, re-sorting each index only once.
+
+        Inserting one by one keeps the sorted structures ordered with a
+        memmove per video, which is quadratic when loading a catalogue.
+        With sort=False the sorted structures are left unsorted until
+        _sort_indexes is called, so that a load made of many chunks only
+        sorts once.
+        """
+        self._thaw_title_order()
+        batch = {}
+        for video in videos:
+            if video.video_id in self._positions:
+                # Removing looks the video up in the sorted indexes.
+                if not self._indexes_sorted:
+                    self._sort_indexes()
+                self._remove(video.video_id)
+            batch[video.video_id] = video
+        for video_id, video in batch.items():
+            self._positions[video_id] = len(self._video_list)
+            self._video_list.append(video)
+        self._title_index.add_all(
+            batch.keys(), [video.title for video in batch.values()])
+        self._title_order.extend(
+            (video.title, video.video_id) for video in batch.values())
+        self._tag_index.add_all(batch.values(), sort=False)
+        self.version += 1
+        if sort:
+            self._sort_indexes()
+        else:
+            self._indexes_sorted = False
+
+    def _thaw_title_order(self):
+        """Turns the title order of a compiled catalogue into a list before
+        it is first changed. This one-off copy is O(n), every later change
+        is a bisect and a memmove again."""
+        if type(self._title_order) is not list:
+            self._title_order = list(self._title_order)
+
+    def _sort_indexes(self):
+        self._title_order.sort()
+        self._tag_index.sort()
+        self._indexes_sorted = True
+
+    def _remove(self, video_id):
+        """Drops a video from the store and every index."""
+        position = self._positions.pop(video_id, None)
+        if position is None:
+            return
+        video = self._video_list[position]
+        # Swap-remove: move the last video into the freed slot.
+        last = self._video_list.pop()
+        if position < len(self._video_list):
+            self._video_list[position] = last
+            self._positions[last.video_id] = position
+        key = (video.title, video_id)
+        self._thaw_title_order()
+        del self._title_order[bisect.bisect_left(self._title_order, key)]
+        self._title_index.remove(video_id)
+        self._tag_index.remove(video)
+        self.version += 1
+
+    def add_video(self, video):
+        """Adds a new video to the library and every index.
+
+        Returns:
+            True, or False if a video with the same id is already in the
+            library.
+        """
+        if video.video_id in self._positions:
+            return False
+        self._add(video)
+        return True
+
+    def remove_video(self, video_id):
+        """Removes a video from the library and every index.
+
+        Returns:
+            True, or False if the video does not exist.
+        """
+        if video_id not in self._positions:
+            return False
+        self._remove(video_id)
+        return True
+
+    def update_video(self, video):
+        """Replaces the video with the same id, e.g. to change its title or tags.
+
+        Returns:
+            True, or False if the video does not exist.
+        """
+        if video.video_id not in self._positions:
+            return False
+        self._add(video)
+        return True
+
+    def _video(self, video_id):
+        return self._video_list[self._positions[video_id]]
+
+    def __len__(self):
+        return len(self._positions)
+
+    def __iter__(self):
+        return iter(self._video_list)
+
+    def videos(self):
+        """Returns a read-only sequence view of all videos, without copying.
+
+        The view reflects later changes to the library.
+        """
+        return VideoView(self._video_list)
+
+    def get_videos_by_title(self):
+        """Returns all videos from the video library, in title order."""
+        return [self._video(video_id) for _, video_id in self._title_order]
+
+    def iter_videos_by_title(self, offset=0):
+        """Yields the videos of the library in title order.
+
+        Args:
+            offset: The number of videos to skip, skipped in O(1).
+        """
+        order = self._title_order
+        for index in range(offset, len(order)):
+            yield self._video(order[index][1])
+
+    def _iter_in_title_order(self, video_ids, limit=None):
+        """Yields the videos for a set of ids, in title order.
+
+        Small sets are sorted directly, or only their first limit videos
+        are selected with a bounded heap. Sets covering a large part of the
+        library are read off the pre-sorted title order instead, which is
+        done lazily so a consumer that stops early does not pay for it.
+        """
+        if len(video_ids) * max(len(video_ids), 2).bit_length() < len(
+                self._title_order):
+            keys = ((self._video(video_id).title, video_id)
+                    for video_id in video_ids)
+            if limit is None:
+                keys = sorted(keys)
+            else:
+                keys = heapq.nsmallest(limit, keys)
+            for _, video_id in keys:
+                yield self._video(video_id)
+        else:
+            for _, video_id in self._title_order:
+                if video_id in video_ids:
+                    yield self._video(video_id)
 
     def get_video(self, video_id):
         """Returns the video object (title, url, tags) from the video library.
@@ -42,4 +506,23 @@ class VideoLibrary:
             The Video object for the requested video_id. None if the video
             does not exist.
         """
-        return self._videos.get(video_id, None)
+        position = self._positions.get(video_id)
+        return None if position is None else self._video_list[position]
+
+    def _search_titles(self, term, limit):
+        """Looks the term up in the title index. Only the first limit
+        matches are ordered, in O(m log limit)."""
+        if len(term) < TitleIndex.GRAM_SIZE:
+            # Short terms match too many titles for the index to help.
+            return self._scan_titles(term)
+        return self._iter_in_title_order(self._title_index.search(term), limit)
+
+    def _scan_titles(self, term):
+        """Yields the videos whose titles contain a casefolded term, in
+        title order, checking the titles in that order."""
+        for title, video_id in self._title_order:
+            if term in title.casefold():
+                yield self._video(video_id)
+
+    def _search_tags(self, query, limit):
+        return map(self._video, self._tag_index.search(query, limit))
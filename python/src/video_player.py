@@ -1,33 +1,146 @@
 """A video player class."""
 
 from .video_library import VideoLibrary
-from .video_playlist import Playlist
+from .video_playlist import ConcurrentPlaylist, Playlist
 from.playback_manager import PlaybackManager
-import random
+from .output_sink import StdoutSink
+from .search_results import SearchResults
+from collections import OrderedDict
+import contextlib
+import functools
+import itertools
+import threading
+
+# The number of rendered video strings a player keeps.
+DISPLAY_CACHE_SIZE = 4096
+
+
+def _playback(method):
+    """Runs a method holding the playback lock of the player."""
+    @functools.wraps(method)
+    def locked(self, *args, **kwargs):
+        with self._playback_lock:
+            return method(self, *args, **kwargs)
+    return locked
+
 
 class VideoPlayer:
-    """A class used to represent a Video Player."""
+    """A class used to represent a Video Player.
+
+    A player created with thread_safe=True may be called from several
+    threads. Playback commands hold a playback lock, playlists are kept in
+    a ConcurrentPlaylist, which locks each playlist separately, and the
+    video library is read without locking. The library must not be changed
+    while it is being read from other threads.
+    """
+
+    def __init__(self, video_library=None, ask=None, output=None,
+                 interactive=True, playlists=None, display_cache=None,
+                 thread_safe=False):
+        """The VideoPlayer class is initialized.
+
+        Args:
+            video_library: The library to play from. A VideoLibrary over
+                the bundled videos.txt is loaded if none is given.
+            ask: Optional callable used instead of input() to ask the user
+                a question, called with the prompt and returning the answer.
+            output: The sink the player writes its output lines to, see
+                output_sink. Lines go straight to stdout by default.
+            interactive: Whether searches ask which result to play. When
+                False they only display the results, which can then be
+                played with play_result.
+            playlists: The Playlist store to use, e.g. one loaded with
+                playlist_journal.open_playlists. A new empty one if None.
+                Must be a ConcurrentPlaylist if thread_safe is set.
+            display_cache: The OrderedDict video strings are cached in, see
+                video_string. Players of the same library can share one.
+            thread_safe: Whether the player may be called from several
+                threads at once.
 
-    def __init__(self):
-        self._video_library = VideoLibrary()
-        self.all_playlists = Playlist()
+        Raises:
+            ValueError: If thread_safe is set and playlists is not a
+                ConcurrentPlaylist.
+        """
+        if video_library is None:
+            video_library = VideoLibrary()
+        self._video_library = video_library
+        self._ask = ask
+        self._out = output if output is not None else StdoutSink()
+        if playlists is None:
+            playlists = ConcurrentPlaylist() if thread_safe else Playlist()
+        elif thread_safe and not isinstance(playlists, ConcurrentPlaylist):
+            raise ValueError("A thread safe player needs its playlists in a "
+                             "ConcurrentPlaylist")
+        self.all_playlists = playlists
         self.playback = PlaybackManager()
+        self._playback_lock = (threading.RLock() if thread_safe
+                               else contextlib.nullcontext())
+        self.interactive = interactive
+        self.last_results = None
+        # video_id -> (video, library version, rendered string), least
+        # recently used first.
+        self._display_cache = (display_cache if display_cache is not None
+                               else OrderedDict())
+
+    def _print(self, *lines):
+        """Writes lines to the output sink in a single write."""
+        self._out.write(lines)
+
+    def output(self, *lines):
+        """Writes lines to the player's output, e.g. messages about commands."""
+        self._print(*lines)
+
+    def ask(self, prompt):
+        """Asks the user a question and returns the answer."""
+        # Anything still buffered has to be seen before the question.
+        self._out.flush()
+        if self._ask is not None:
+            return self._ask(prompt)
+        return input(prompt)
 
     def video_string(self, video):
-        return f"{video.title} ({video.video_id}) [{' '.join(video.tags)}]"
+        """Returns how a video is displayed, e.g. in listings and results.
+
+        Videos are immutable, so the strings of the most recently displayed
+        videos are kept. A cached string is reused for the very video it
+        was rendered from, or for any video with the same id while the
+        library version is unchanged. Backends such as sqlite_backend
+        create a new Video on every read. A catalogue entry replaced under
+        the same id changes the version and is rendered afresh.
+        """
+        cache = self._display_cache
+        version = self._video_library.version
+        cached = cache.get(video.video_id)
+        # Another thread may evict an entry between two of these steps,
+        # which only costs a cache miss.
+        if cached is not None and (cached[0] is video
+                                   or cached[1] == version):
+            with contextlib.suppress(KeyError):
+                cache.move_to_end(video.video_id)
+            return cached[2]
+        text = f"{video.title} ({video.video_id}) [{' '.join(video.tags)}]"
+        cache[video.video_id] = (video, version, text)
+        if len(cache) > DISPLAY_CACHE_SIZE:
+            with contextlib.suppress(KeyError):
+                cache.popitem(last=False)
+        return text
 
     def number_of_videos(self):
-        num_videos = len(self._video_library.get_all_videos())
-        print(f"{num_videos} videos in the library")
+        num_videos = len(self._video_library)
+        self._print(f"{num_videos} videos in the library")
 
-    def show_all_videos(self):
-        """Returns all videos."""
-        videos = self._video_library.get_all_videos()
-        videos.sort(key=lambda x: x.title)
-        print("Here's a list of all available videos:")
-        for video in videos:
-            print(self.video_string(video))
+    def show_all_videos(self, limit=None, offset=0):
+        """Returns all videos.
+        Args:
+            limit: The most videos to show, all of them if None.
+            offset: The number of videos to skip.
+        """
+        videos = itertools.islice(
+            self._video_library.iter_videos_by_title(offset), limit)
+        self._print("Here's a list of all available videos:",
+                    *map(self.video_string, videos))
 
+    @_playback
     def play_video(self, video_id):
         """Plays the respective video.
         Args:
@@ -35,87 +148,123 @@ class VideoPlayer:
         """
         video = self._video_library.get_video(video_id)
         if not video:
-            print("Cannot play video: Video does not exist")
+            self._print("Cannot play video: Video does not exist")
             return
         if self.playback.current_video is not None:
-            print(f"Stopping video: {self.playback.current_video.title}")
-        print(f"Playing video: {video.title}")
+            self._print(f"Stopping video: {self.playback.current_video.title}")
+        self._print(f"Playing video: {video.title}")
         self.playback.video_is_playing(video)
+        # A video chosen by hand ends any random run.
+        self.playback.queue_cleared()
 
+    @_playback
     def stop_video(self):
         """Stops the current video."""
         if self.playback.current_video == None:
-            print("Cannot stop video: No video is currently playing")
+            self._print("Cannot stop video: No video is currently playing")
             return
         else:
-            print(f"Stopping video: {self.playback.current_video.title}")
+            self._print(f"Stopping video: {self.playback.current_video.title}")
             self.playback.video_stopped()
+            self.playback.queue_cleared()
+
+    @_playback
+    def play_random_video(self, count=1):
+        """Plays a random video from the video library.
 
-    def play_random_video(self):
-        """Plays a random video from the video library."""
+        The picks replace any videos still queued from an earlier run and
+        never include the video currently playing, unless it is the only
+        video there is, so NEXT plays count distinct videos.
+
+        Args:
+            count: The number of distinct random videos to pick. The first
+                one is played and the others are queued after it.
+        """
+        current = self.playback.current_video
+        videos = None
+        if current is not None:
+            videos = self._video_library.random_videos(
+                count, exclude={current.video_id})
+        if not videos:
+            videos = self._video_library.random_videos(count)
+        if not videos:
+            self._print("No videos available")
+            return
         if self.playback.current_video is not None:
-            print(f"Stopping video: {self.playback.current_video.title}")
-        video = random.choice(self._video_library.get_all_videos())
-        print(f"Playing video: {video.title}")
+            self._print(f"Stopping video: {self.playback.current_video.title}")
+        self._print(f"Playing video: {videos[0].title}")
+        self.playback.video_is_playing(videos[0])
+        self.playback.queue_cleared()
+        for video in videos[1:]:
+            self.playback.video_queued(video)
+            self._print(f"Queued video: {video.title}")
+
+    @_playback
+    def play_next_video(self):
+        """Plays the next video from the queue."""
+        video = self.playback.next_queued_video()
+        if video is None:
+            self._print("Cannot play next video: No videos are queued")
+            return
+        if self.playback.current_video is not None:
+            self._print(f"Stopping video: {self.playback.current_video.title}")
+        self._print(f"Playing video: {video.title}")
         self.playback.video_is_playing(video)
 
+    @_playback
     def pause_video(self):
         """Pauses the current video."""
         if self.playback.current_video is None:
-            print("Cannot pause video: No video is currently playing")
+            self._print("Cannot pause video: No video is currently playing")
             return
         elif self.playback.is_paused == True:
-            print(f"Video already paused: {self.playback.current_video.title}")
+            self._print(f"Video already paused: {self.playback.current_video.title}")
         else:
-            print(f"Pausing video: {self.playback.current_video.title}")
+            self._print(f"Pausing video: {self.playback.current_video.title}")
             self.playback.video_paused()
 
+    @_playback
     def continue_video(self):
         """Resumes playing the current video."""
         if self.playback.current_video is None:
-            print(f"Cannot continue video: No video is currently playing")
+            self._print(f"Cannot continue video: No video is currently playing")
             return
         elif self.playback.is_paused == False:
-            print(f"Cannot continue video: Video is not paused")
+            self._print(f"Cannot continue video: Video is not paused")
             return
         else:
-            print(f"Continuing video: {self.playback.current_video.title}")
+            self._print(f"Continuing video: {self.playback.current_video.title}")
             self.playback.video_paused()
 
+    @_playback
     def show_playing(self):
         """Displays video currently playing."""
         if self.playback.current_video is None:
-            print("No video is currently playing")
+            self._print("No video is currently playing")
             return
         video = self.playback.current_video
         if self.playback.is_paused:
-            print(f"Currently playing: {self.video_string(video)} - PAUSED")
+            self._print(f"Currently playing: {self.video_string(video)} - PAUSED")
         else:
-            print(f"Currently playing: {self.video_string(video)}")
+            self._print(f"Currently playing: {self.video_string(video)}")
 
     def playlist_exists(self, playlist_name):
-        """Checks whether the playlist exists, returns the playlist if it does, and False otherwise.
+        """Checks whether the playlist exists, returns the playlist if it does, and None otherwise.
         Args:
             playlist_name: The playlist name.
         """
-        this_playlist = False
-        for playlist in self.all_playlists.playlists:
-            for item in playlist:
-                if item.upper() == playlist_name.upper():
-                    this_playlist = playlist
-        return this_playlist
+        return self.all_playlists.get(playlist_name)
 
     def create_playlist(self, playlist_name):
         """Creates a playlist with a given name.
         Args:
             playlist_name: The playlist name.
         """
-        if self.playlist_exists(playlist_name):
-            print("Cannot create playlist: A playlist with the same name already exists.")
+        if not self.all_playlists.add_playlist(playlist_name):
+            self._print("Cannot create playlist: A playlist with the same name already exists.")
             return
         else:
-            self.all_playlists.add_playlist(playlist_name)
-            print(f"Successfully created new playlist: {playlist_name}")
+            self._print(f"Successfully created new playlist: {playlist_name}")
             # print(self.all_playlists.playlists)
 
     def add_to_playlist(self, playlist_name, video_id):
@@ -124,41 +273,53 @@ class VideoPlayer:
             playlist_name: The playlist name.
             video_id: The video_id to be added.
         """
-        if self.playlist_exists(playlist_name) == False:
-            print(f"Cannot add video to {playlist_name}: Playlist does not exist")
+        this_playlist = self.playlist_exists(playlist_name)
+        if this_playlist is None:
+            self._print(f"Cannot add video to {playlist_name}: Playlist does not exist")
             return
 
         video = self._video_library.get_video(video_id)
         if not video:
-            print(f"Cannot add video to {playlist_name}: Video does not exist")
+            self._print(f"Cannot add video to {playlist_name}: Video does not exist")
             return
 
-        already_video = False
-        for playlist in self.all_playlists.playlists:
-            for item in playlist:
-                if video_id == item:
-                    already_video = True
-        if already_video:
-            print(f"Cannot add video to {playlist_name}: Video already added")
+        if not self.all_playlists.add_video(playlist_name, video_id):
+            self._print(f"Cannot add video to {playlist_name}: Video already added")
             return
+        self._print(f"Added video to {playlist_name}: {video.title}")
 
-        self.all_playlists.add_video(playlist_name, video_id)
-        print(f"Added video to {playlist_name}: {video.title}")
-        # print(self.all_playlists.playlists)
+    def add_all_to_playlist(self, playlist_name, video_ids):
+        """Adds several videos to a playlist with a given name in one pass.
+
+        Videos that do not exist or are already in the playlist are reported
+        and skipped, the rest are added in the order given.
+        Args:
+            playlist_name: The playlist name.
+            video_ids: The video_ids to be added.
+        """
+        this_playlist = self.playlist_exists(playlist_name)
+        if this_playlist is None:
+            self._print(f"Cannot add videos to {playlist_name}: Playlist does not exist")
+            return
+
+        to_add = {}
+        for video_id in video_ids:
+            if self._video_library.get_video(video_id) is None:
+                self._print(f"Cannot add video {video_id} to {playlist_name}: Video does not exist")
+            elif video_id in this_playlist or video_id in to_add:
+                self._print(f"Cannot add video {video_id} to {playlist_name}: Video already added")
+            else:
+                to_add[video_id] = None
+
+        added = self.all_playlists.add_videos(playlist_name, to_add)
+        self._print(f"Added {added} videos to {playlist_name}")
 
     def show_all_playlists(self):
         """Display all playlists."""
-        if self.all_playlists.playlists == []:
-            print("No playlists exist yet")
+        if not self.all_playlists:
+            self._print("No playlists exist yet")
             return
-        playlist_names = []
-        for playlist in self.all_playlists.playlists:
-            playlist_name = playlist[0]
-            playlist_names.append(playlist_name)
-        playlist_names.sort()
-        print(f"Showing all playlists:")
-        for name in playlist_names:
-            print(name)
+        self._print(f"Showing all playlists:", *self.all_playlists.names())
 
     def show_playlist(self, playlist_name):
         """Display all videos in a playlist with a given name.
@@ -166,18 +327,18 @@ class VideoPlayer:
             playlist_name: The playlist name.
         """
         this_playlist = self.playlist_exists(playlist_name)
-        if this_playlist == False:
-            print(f"Cannot show playlist {playlist_name}: Playlist does not exist")
+        if this_playlist is None:
+            self._print(f"Cannot show playlist {playlist_name}: Playlist does not exist")
             return
-        list_videos = this_playlist[1:]
-        print(f"Showing playlist: {playlist_name}")
-        if list_videos == []:
-            print(f"    No videos here yet")
+        if not this_playlist:
+            self._print(f"Showing playlist: {playlist_name}",
+                        f"    No videos here yet")
         else:
-            for id in list_videos:
-                video = self._video_library.get_video(id)
-                print(self.video_string(video))
-                # print(f"{video.title} ({video.video_id}) [{' '.join(video.tags)}]")
+            # Videos removed from the library since are left out.
+            videos = filter(None, map(self._video_library.get_video,
+                                      this_playlist))
+            self._print(f"Showing playlist: {playlist_name}",
+                        *map(self.video_string, videos))
 
     def remove_from_playlist(self, playlist_name, video_id):
         """Removes a video to a playlist with a given name.
@@ -186,18 +347,20 @@ class VideoPlayer:
             video_id: The video_id to be removed.
         """
         this_playlist = self.playlist_exists(playlist_name)
-        if this_playlist == False:
-            print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
+        if this_playlist is None:
+            self._print(f"Cannot remove video from {playlist_name}: Playlist does not exist")
             return
         video = self._video_library.get_video(video_id)
-        if not video:
-            print(f"Cannot remove video from {playlist_name}: Video does not exist")
-            return
-        if video.video_id not in this_playlist:
-            print(f"Cannot remove video from {playlist_name}: Video is not in playlist")
+        # Videos removed from the library since can still be removed from
+        # playlists, they are named by their id.
+        if not self.all_playlists.remove_video(playlist_name, video_id):
+            if not video:
+                self._print(f"Cannot remove video from {playlist_name}: Video does not exist")
+            else:
+                self._print(f"Cannot remove video from {playlist_name}: Video is not in playlist")
             return
-        self.all_playlists.remove_video(playlist_name, video_id)
-        print(f"Removed video from {playlist_name}: {video.title}")
+        title = video.title if video else video_id
+        self._print(f"Removed video from {playlist_name}: {title}")
         # print(self.all_playlists.playlists)
 
     def clear_playlist(self, playlist_name):
@@ -205,11 +368,10 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        if self.playlist_exists(playlist_name) == False:
-            print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
+        if not self.all_playlists.clear_playlist(playlist_name):
+            self._print(f"Cannot clear playlist {playlist_name}: Playlist does not exist")
             return
-        self.all_playlists.clear_playlist(playlist_name)
-        print(f"Successfully removed all videos from {playlist_name}")
+        self._print(f"Successfully removed all videos from {playlist_name}")
         # print(self.all_playlists.playlists)
 
     def delete_playlist(self, playlist_name):
@@ -217,83 +379,114 @@ class VideoPlayer:
         Args:
             playlist_name: The playlist name.
         """
-        if self.playlist_exists(playlist_name) == False:
-            print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
+        if not self.all_playlists.delete_playlist(playlist_name):
+            self._print(f"Cannot delete playlist {playlist_name}: Playlist does not exist")
             return
-        self.all_playlists.delete_playlist(playlist_name)
-        print(f"Deleted playlist: {playlist_name}")
+        self._print(f"Deleted playlist: {playlist_name}")
         # print(self.all_playlists.playlists)
 
-    # def search_results(self, ):
+    def find_videos(self, search_term, limit=None, offset=0):
+        """Searches video titles without displaying or asking anything.
 
-    def search_videos(self, search_term):
-        """Display all the videos whose titles contain the search_term.
+        The results are kept as the last results, for play_result.
         Args:
             search_term: The query to be used in search.
+            limit: The most results to return, all of them if None.
+            offset: The number of results to skip.
+
+        Returns:
+            The SearchResults.
         """
-        matches = []
-        for video in self._video_library.get_all_videos():
-            if search_term.upper() in video.title.upper():
-                matches.append(video)
-        if matches == []:
-            print(f"No search results for {search_term}")
+        bound = None if limit is None else offset + limit
+        return self._keep_results(
+            search_term,
+            self._video_library.iter_search_titles(search_term, bound),
+            limit, offset)
+
+    def find_videos_tag(self, video_tag, limit=None, offset=0):
+        """Searches video tags without displaying or asking anything.
+
+        The results are kept as the last results, for play_result.
+        Args:
+            video_tag: The video tag(s) to be used in search, as for
+                search_videos_tag.
+            limit: The most results to return, all of them if None.
+            offset: The number of results to skip.
+
+        Returns:
+            The SearchResults.
+        """
+        bound = None if limit is None else offset + limit
+        return self._keep_results(
+            video_tag, self._video_library.iter_search_tags(video_tag, bound),
+            limit, offset)
+
+    def _keep_results(self, query, matches, limit, offset):
+        # Only the videos of the page are taken from the lazy matches.
+        stop = None if limit is None else offset + limit
+        self.last_results = SearchResults(
+            query, itertools.islice(matches, offset, stop), offset)
+        return self.last_results
+
+    def _show_search_results(self, results):
+        """Displays search results, then asks which one to play if interactive.
+
+        Args:
+            results: The SearchResults to display.
+        """
+        if not results:
+            self._print(f"No search results for {results.query}")
+            return
+        self._print(f"Here are the results for {results.query}:",
+                    *(f"    {number}) {self.video_string(video)}"
+                      for number, video in results.numbered()))
+        if not self.interactive:
+            self._print("Use PLAY_RESULT <number> to play any of the above.")
             return
-        matches.sort(key=lambda x: x.title)
-        print(f"Here are the results for {search_term}:")
-        count = 1
-        for video in matches:
-            print(f"    {count}) {self.video_string(video)}]")
-            count += 1
-        print("Would you like to play any of the above? If yes, specify the number of the video.")
-        answer = input(f"If your answer is not a valid number, we will assume it's a no.\n")
+        self._print("Would you like to play any of the above? If yes, specify the number of the video.",
+                    "If your answer is not a valid number, we will assume it's a no.")
+        answer = self.ask("")
         try:
-            try:
-                index = int(answer) - 1
-                if index < 0:
-                    return
-                video = matches[index]
-                self.play_video(video.video_id)
-            except IndexError:
-                return
+            video = results.get(int(answer))
         except ValueError:
             return
+        if video is not None:
+            self.play_video(video.video_id)
+
+    def search_videos(self, search_term, limit=None, offset=0):
+        """Display all the videos whose titles contain the search_term.
+        Args:
+            search_term: The query to be used in search.
+            limit: The most results to show, all of them if None.
+            offset: The number of results to skip.
+        """
+        self._show_search_results(
+            self.find_videos(search_term, limit, offset))
 
-    def search_videos_tag(self, video_tag):
+    def search_videos_tag(self, video_tag, limit=None, offset=0):
         """Display all videos whose tags contains the provided tag .
         Args:
-            video_tag: The video tag to be used in search.
+            video_tag: The video tag to be used in search. Several tags can
+                be combined, e.g. "#cat,#animal -#dog" or "#cat|#dog".
+            limit: The most results to show, all of them if None.
+            offset: The number of results to skip.
         """
-        matches = []
-        this_video = False
-        for video in self._video_library.get_all_videos():
-            for tag in video.tags:
-                if video_tag.upper() == tag.upper():
-                    this_video = True
-            if this_video:
-                matches.append(video)
-            this_video = False
-        if matches == []:
-            print(f"No search results for {video_tag}")
+        self._show_search_results(
+            self.find_videos_tag(video_tag, limit, offset))
+
+    def play_result(self, number):
+        """Plays a video from the last search results.
+        Args:
+            number: The number of the video, as it was displayed.
+        """
+        if self.last_results is None:
+            self._print("Cannot play result: No search results to play from")
             return
-        matches.sort(key=lambda x: x.title)
-        print(f"Here are the results for {video_tag}:")
-        count = 1
-        for video in matches:
-            print(f"    {count}) {self.video_string(video)}]")
-            count += 1
-        print("Would you like to play any of the above? If yes, specify the number of the video.")
-        answer = input(f"If your answer is not a valid number, we will assume it's a no.\n")
-        try:
-            try:
-                index = int(answer) - 1
-                if index < 0:
-                    return
-                video = matches[index]
-                self.play_video(video.video_id)
-            except IndexError:
-                return
-        except ValueError:
+        video = self.last_results.get(number)
+        if video is None:
+            self._print(f"Cannot play result: There is no result number {number}")
             return
+        self.play_video(video.video_id)
 
     def flag_video(self, video_id, flag_reason=""):
         """Mark a video as flagged.
@@ -302,7 +495,7 @@ class VideoPlayer:
             video_id: The video_id to be flagged.
             flag_reason: Reason for flagging the video.
         """
-        print("flag_video needs implementation")
+        self._print("flag_video needs implementation")
 
     def allow_video(self, video_id):
         """Removes a flag from a video.
@@ -310,4 +503,4 @@ class VideoPlayer:
         Args:
             video_id: The video_id to be allowed again.
         """
-        print("allow_video needs implementation")
+        self._print("allow_video needs implementation")
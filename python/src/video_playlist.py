@@ -1,35 +1,184 @@
 """A video playlist class."""
 
+import bisect
+import threading
+
+
+class PlaylistEntry:
+    """A class used to represent a single named playlist."""
+    def __init__(self, name: str):
+        self.name = name
+        # Used as an insertion-ordered set of video ids.
+        self.videos = {}
+
+    def __contains__(self, video_id):
+        return video_id in self.videos
+
+    def __iter__(self):
+        return iter(self.videos)
+
+    def __len__(self):
+        return len(self.videos)
+
 
 class Playlist:
-    """A class used to represent a Playlist."""
+    """A class used to represent a Playlist store.
+
+    Playlists are keyed by their casefolded name so that every lookup is a
+    single dictionary hit, while the entry keeps the name it was created
+    with for display.
+
+    Every change is also recorded by the journal, if one is attached, see
+    playlist_journal.
+    """
+    def __init__(self):
+        self.playlists = {}
+        self._sorted_names = []
+        self.journal = None
+
+    def _record(self, op, playlist_name, **fields):
+        if self.journal is not None:
+            self.journal.record(op, playlist_name, **fields)
+
+    _new_entry = PlaylistEntry
+
+    @staticmethod
+    def _key(playlist_name):
+        return playlist_name.casefold()
+
+    def __len__(self):
+        return len(self.playlists)
+
+    def exists(self, playlist_name):
+        return self._key(playlist_name) in self.playlists
+
+    def get(self, playlist_name):
+        """Returns the PlaylistEntry for the name, or None if it does not exist."""
+        return self.playlists.get(self._key(playlist_name))
+
+    def names(self):
+        """Returns the display names of all playlists in sorted order."""
+        return list(self._sorted_names)
+
+    def add_playlist(self, playlist_name: str):
+        key = self._key(playlist_name)
+        if key in self.playlists:
+            return False
+        self.playlists[key] = self._new_entry(playlist_name)
+        bisect.insort(self._sorted_names, playlist_name)
+        self._record("create", playlist_name)
+        return True
+
+    def add_video(self, playlist_name, video_id):
+        playlist = self.get(playlist_name)
+        if playlist is None or video_id in playlist.videos:
+            return False
+        playlist.videos[video_id] = None
+        self._record("add", playlist_name, video_ids=[video_id])
+        return True
+
+    def add_videos(self, playlist_name, video_ids):
+        """Adds every video id not already in the playlist, returns how many were added."""
+        playlist = self.get(playlist_name)
+        if playlist is None:
+            return 0
+        added = [video_id for video_id in dict.fromkeys(video_ids)
+                 if video_id not in playlist.videos]
+        playlist.videos.update(dict.fromkeys(added))
+        if added:
+            self._record("add", playlist_name, video_ids=added)
+        return len(added)
+
+    def remove_video(self, playlist_name, video_id):
+        playlist = self.get(playlist_name)
+        if playlist is None or video_id not in playlist.videos:
+            return False
+        del playlist.videos[video_id]
+        self._record("remove", playlist_name, video_id=video_id)
+        return True
+
+    def clear_playlist(self, playlist_name):
+        playlist = self.get(playlist_name)
+        if playlist is None:
+            return False
+        playlist.videos.clear()
+        self._record("clear", playlist_name)
+        return True
+
+    def delete_playlist(self, playlist_name):
+        playlist = self.playlists.pop(self._key(playlist_name), None)
+        if playlist is None:
+            return False
+        index = bisect.bisect_left(self._sorted_names, playlist.name)
+        del self._sorted_names[index]
+        self._record("delete", playlist_name)
+        return True
+
+
+class ConcurrentPlaylistEntry(PlaylistEntry):
+    """A class used to represent a playlist that several threads change.
+
+    Iterating it walks a copy of its videos, taken in one step, so readers
+    need no lock and never see the playlist change under them.
+    """
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.lock = threading.Lock()
+
+    def __iter__(self):
+        return iter(list(self.videos))
+
+
+class ConcurrentPlaylist(Playlist):
+    """A class used to represent a Playlist store shared between threads.
+
+    Creating and deleting playlists holds a lock on the store, and changing
+    the videos of a playlist holds the lock of that playlist only, so that
+    threads working on different playlists do not wait for each other.
+    Reads take no lock.
+    """
+    _new_entry = ConcurrentPlaylistEntry
+
     def __init__(self):
-        self.playlists = []
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def _locked(self, missing, change, playlist_name, *args):
+        """Calls change(playlist_name, *args) holding the playlist's lock.
+
+        Returns:
+            What change returns, or missing if the playlist does not exist.
+        """
+        while True:
+            playlist = self.get(playlist_name)
+            if playlist is None:
+                return missing
+            with playlist.lock:
+                # Otherwise it was deleted, and maybe created again, while
+                # waiting for the lock.
+                if self.get(playlist_name) is playlist:
+                    return change(playlist_name, *args)
 
     def add_playlist(self, playlist_name: str):
-        self.playlists.append([playlist_name])
+        with self._lock:
+            return super().add_playlist(playlist_name)
 
     def add_video(self, playlist_name, video_id):
-        for playlist in self.playlists:
-            for item in playlist:
-                if item.upper() == playlist_name.upper():
-                    playlist.append(video_id)
+        return self._locked(False, super().add_video, playlist_name, video_id)
+
+    def add_videos(self, playlist_name, video_ids):
+        """Adds every video id not already in the playlist, returns how many were added."""
+        return self._locked(0, super().add_videos, playlist_name, video_ids)
 
     def remove_video(self, playlist_name, video_id):
-        for playlist in self.playlists:
-            for item in playlist:
-                if item.upper() == playlist_name.upper():
-                    playlist.remove(video_id)
+        return self._locked(False, super().remove_video, playlist_name,
+                            video_id)
 
     def clear_playlist(self, playlist_name):
-        for playlist in self.playlists:
-            for item in playlist:
-                if item.upper() == playlist_name.upper():
-                    for item_to_remove in playlist[1:]:
-                        playlist.remove(item_to_remove)
+        return self._locked(False, super().clear_playlist, playlist_name)
 
     def delete_playlist(self, playlist_name):
-        for playlist in self.playlists:
-            for item in playlist:
-                if item.upper() == playlist_name.upper():
-                    self.playlists.remove(playlist)
+        with self._lock:
+            # Changes already under way on the playlist finish first.
+            return self._locked(False, super().delete_playlist,
+                                playlist_name)
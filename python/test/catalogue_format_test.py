@@ -0,0 +1,121 @@
+import pytest
+
+from src.catalogue_format import (
+    compile_catalogue, is_columnar_catalogue, read_columnar_catalogue)
+from src.compile_catalogue import main
+from src.video import Video
+from src.video_library import DEFAULT_CATALOGUE, VideoLibrary
+
+
+def test_compiled_library_matches_text_library(tmp_path):
+    compiled = tmp_path / "videos.col"
+    assert compile_catalogue(DEFAULT_CATALOGUE, compiled) == 5
+    assert is_columnar_catalogue(compiled)
+    assert not is_columnar_catalogue(DEFAULT_CATALOGUE)
+
+    text_library = VideoLibrary()
+    library = VideoLibrary(compiled)
+
+    def ids(videos):
+        return [video.video_id for video in videos]
+
+    assert len(library) == 5
+    assert ids(library.get_videos_by_title()) == ids(
+        text_library.get_videos_by_title())
+    assert ids(library.search_titles("cat")) == ids(
+        text_library.search_titles("cat"))
+    assert ids(library.search_tags("#animal -#cat")) == [
+        "funny_dogs_video_id"]
+    assert library.get_video("nothing_video_id").tags == ()
+    assert library.get_video("amazing_cats_video_id").tags == (
+        "#cat", "#animal")
+
+
+def test_compile_merges_tags_differing_in_case(tmp_path):
+    source = tmp_path / "videos.txt"
+    source.write_text(
+        "Amazing Cats | amazing_cats_video_id | #cat, #Animal\n"
+        "Funny Dogs | funny_dogs_video_id | #dog, #animal\n"
+        "Funny Dogs 2 | funny_dogs_video_id | #dog, #ANIMAL, #animal\n")
+    compiled = tmp_path / "videos.col"
+    compile_catalogue(source, compiled)
+    library = VideoLibrary(compiled)
+
+    assert len(library) == 2
+    assert [video.title for video in library.search_tags("#animal")] == [
+        "Amazing Cats", "Funny Dogs 2"]
+
+
+def test_compile_keeps_empty_strings(tmp_path):
+    source = tmp_path / "videos.txt"
+    source.write_text("Some Video | v1 | ,\n")
+    compiled = tmp_path / "videos.col"
+    compile_catalogue(source, compiled)
+    library = VideoLibrary(compiled)
+
+    assert library.get_video("v1").tags == VideoLibrary(source).get_video(
+        "v1").tags == ("", "")
+    assert read_columnar_catalogue(compiled).tag_sets == [("", "")]
+
+    source.write_text("")
+    compile_catalogue(source, compiled)
+    assert len(VideoLibrary(compiled)) == 0
+
+
+def test_read_rejects_other_files():
+    with pytest.raises(ValueError):
+        read_columnar_catalogue(DEFAULT_CATALOGUE)
+
+
+def test_compile_catalogue_entry_point(tmp_path, capfd):
+    compiled = tmp_path / "videos.col"
+    assert main([str(DEFAULT_CATALOGUE), str(compiled)]) == 0
+    assert main([]) == 2
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert f"Compiled 5 videos from {DEFAULT_CATALOGUE} into {compiled}" in lines[0]
+    assert "Usage" in lines[1]
+
+
+def test_compiled_library_creates_videos_as_they_are_used(tmp_path):
+    compiled = tmp_path / "videos.col"
+    compile_catalogue(DEFAULT_CATALOGUE, compiled)
+    library = VideoLibrary(compiled)
+
+    assert library._video_list._videos == [None] * 5
+    video = library.get_video("funny_dogs_video_id")
+    assert library.get_video("funny_dogs_video_id") is video
+    assert library._video_list._videos.count(None) == 4
+    assert [video.video_id for video in library.videos()[-2:]] == [
+        video.video_id for video in VideoLibrary().videos()[-2:]]
+
+
+def test_compiled_library_can_be_changed(tmp_path):
+    compiled = tmp_path / "videos.col"
+    compile_catalogue(DEFAULT_CATALOGUE, compiled)
+    library = VideoLibrary(compiled)
+
+    assert library.remove_video("amazing_cats_video_id")
+    assert library.add_video(Video("Zebra Cats", "zebra_video_id", ["#cat"]))
+    assert library.update_video(
+        Video("Dogs", "funny_dogs_video_id", ["#dog"]))
+    assert [video.title for video in library.get_videos_by_title()] == [
+        "Another Cat Video", "Dogs", "Life at Google", "Video about nothing",
+        "Zebra Cats"]
+    assert [video.title for video in library.search_tags("#cat")] == [
+        "Another Cat Video", "Zebra Cats"]
+    assert [video.title for video in library.search_tags("#animal")] == [
+        "Another Cat Video"]
+    assert [video.title for video in library.search_titles("cat")] == [
+        "Another Cat Video", "Zebra Cats"]
+    assert {video.video_id for video in library.videos()} == {
+        video.video_id for video in library.get_videos_by_title()}
+
+
+def test_read_asks_to_recompile_other_versions(tmp_path):
+    compiled = tmp_path / "videos.col"
+    compile_catalogue(DEFAULT_CATALOGUE, compiled)
+    data = compiled.read_bytes()
+    compiled.write_bytes(data[:7] + b"1" + data[8:])
+    with pytest.raises(ValueError, match="compile it again"):
+        read_columnar_catalogue(compiled)
@@ -0,0 +1,113 @@
+import sys
+from unittest import mock
+
+import pytest
+
+from src import command_parser
+from src.command_parser import (
+    CommandException, CommandParser, register_command)
+from src.video_player import VideoPlayer
+
+
+def test_execute_command_is_case_insensitive(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["play", "amazing_cats_video_id"])
+    parser.execute_command(["Number_Of_Videos"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Playing video: Amazing Cats" in lines[0]
+    assert "5 videos in the library" in lines[1]
+
+
+def test_execute_command_checks_arity():
+    parser = CommandParser(VideoPlayer())
+    with pytest.raises(CommandException, match="followed by video_id"):
+        parser.execute_command(["PLAY"])
+    with pytest.raises(CommandException, match="followed by video_id"):
+        parser.execute_command(["PLAY", "a", "b"])
+    with pytest.raises(CommandException, match="optional number"):
+        parser.execute_command(["PLAY_RANDOM", "zero"])
+    with pytest.raises(CommandException, match="optional number"):
+        parser.execute_command(["PLAY_RANDOM", "\u00b2"])
+    with pytest.raises(CommandException, match="valid command"):
+        parser.execute_command([])
+
+
+def test_execute_unknown_command(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["DANCE"])
+    out, err = capfd.readouterr()
+    assert "Please enter a valid command" in out
+
+
+def test_register_command_on_one_parser(capfd):
+    parser = CommandParser(VideoPlayer())
+    other_parser = CommandParser(VideoPlayer())
+    parser.register_command(
+        "GREET", lambda player, name: print(f"Hello {name}"),
+        min_args=1, max_args=1, usage="Please enter GREET followed by a name.",
+        help_text="GREET <name> - Says hello.")
+    parser.execute_command(["greet", "you"])
+    other_parser.execute_command(["GREET", "you"])
+    parser.execute_command(["HELP"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Hello you" in lines[0]
+    assert "Please enter a valid command" in lines[1]
+    assert "    GREET <name> - Says hello." in lines
+
+
+def test_register_command_globally(capfd, monkeypatch):
+    monkeypatch.setattr(
+        command_parser, "_COMMANDS", dict(command_parser._COMMANDS))
+    register_command("PING_TEST", lambda player: print("PONG"))
+    CommandParser(VideoPlayer()).execute_command(["PING_TEST"])
+    out, err = capfd.readouterr()
+    assert "PONG" in out
+
+
+def test_execute_command_with_page_options(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SHOW_ALL_VIDEOS", "--offset", "4"])
+    parser.execute_command(["SEARCH_VIDEOS", "--limit", "0", "cat"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Video about nothing (nothing_video_id) []" in lines[1]
+    assert "No search results for cat" in lines[2]
+    with pytest.raises(CommandException, match="--limit followed by a number"):
+        parser.execute_command(["SEARCH_VIDEOS", "cat", "--limit", "all"])
+    with pytest.raises(CommandException, match="--top followed by a number"):
+        parser.execute_command(["SEARCH_VIDEOS", "cat", "--top", "\u00b3"])
+    with pytest.raises(CommandException,
+                       match="--offset followed by a number"):
+        parser.execute_command(["SEARCH_VIDEOS", "cat", "--offset",
+                                str(sys.maxsize + 1)])
+    with pytest.raises(CommandException, match="--limit followed by a number"):
+        parser.execute_command(["SHOW_ALL_VIDEOS", "--limit",
+                                "99999999999999999999"])
+    parser.execute_command(["SHOW_ALL_VIDEOS", "--limit", str(sys.maxsize)])
+
+
+@mock.patch('builtins.input', lambda *args: 'No')
+def test_execute_search_with_top(capfd):
+    parser = CommandParser(VideoPlayer())
+    parser.execute_command(["SEARCH_VIDEOS", "a", "--top", "1"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "Here are the results for a:" in lines[0]
+    assert "1) Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[1]
+    assert "Would you like to play any of the above?" in lines[2]
+
+
+def test_execute_play_result(capfd):
+    parser = CommandParser(VideoPlayer(interactive=False))
+    parser.execute_command(["SEARCH_VIDEOS", "cat"])
+    parser.execute_command(["PLAY_RESULT", "1"])
+    out, err = capfd.readouterr()
+    assert "Playing video: Amazing Cats" in out.splitlines()[-1]
+    with pytest.raises(CommandException, match="number of a search result"):
+        parser.execute_command(["PLAY_RESULT", "first"])
+    with pytest.raises(CommandException, match="number of a search result"):
+        parser.execute_command(["PLAY_RESULT", "\u00b9"])
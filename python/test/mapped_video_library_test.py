@@ -0,0 +1,65 @@
+import pytest
+
+from src.mapped_video_library import (
+    MappedVideoLibrary, build_mapped_catalogue, is_mapped_catalogue)
+from src.video_library import DEFAULT_CATALOGUE, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def mapped_library(tmp_path):
+    path = tmp_path / "videos.map"
+    assert build_mapped_catalogue(DEFAULT_CATALOGUE, path) == 5
+    library = MappedVideoLibrary(path)
+    yield library
+    library.close()
+
+
+def test_detects_mapped_catalogue(mapped_library, tmp_path):
+    assert is_mapped_catalogue(tmp_path / "videos.map")
+    assert not is_mapped_catalogue(DEFAULT_CATALOGUE)
+    with pytest.raises(ValueError):
+        MappedVideoLibrary(DEFAULT_CATALOGUE)
+
+
+def test_mapped_library_matches_video_library(mapped_library):
+    library = VideoLibrary()
+
+    def ids(videos):
+        return [video.video_id for video in videos]
+
+    assert len(mapped_library) == len(library)
+    assert ids(mapped_library.get_videos_by_title()) == ids(
+        library.get_videos_by_title())
+    assert ids(mapped_library.search_titles("cat")) == ids(
+        library.search_titles("cat"))
+    assert ids(mapped_library.search_tags("#animal -#dog")) == ids(
+        library.search_tags("#animal -#dog"))
+    assert set(ids(mapped_library.random_videos(10))) == set(ids(library))
+
+
+def test_mapped_library_get_video(mapped_library):
+    video = mapped_library.get_video("amazing_cats_video_id")
+
+    assert video.title == "Amazing Cats"
+    assert video.tags == ("#cat", "#animal")
+    assert mapped_library.get_video("nothing_video_id").tags == ()
+    assert mapped_library.get_video("does_not_exist") is None
+    assert mapped_library.get_video("zzz") is None
+
+
+def test_player_with_mapped_library(mapped_library, capfd):
+    player = VideoPlayer(mapped_library)
+    player.number_of_videos()
+    player.play_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "5 videos in the library" in lines[0]
+    assert "Playing video: Funny Dogs" in lines[1]
+
+
+def test_video_string_is_cached_across_reads(mapped_library):
+    player = VideoPlayer(mapped_library)
+    text = player.video_string(mapped_library.get_video("funny_dogs_video_id"))
+    other = mapped_library.get_video("funny_dogs_video_id")
+    assert player.video_string(other) is text
@@ -0,0 +1,49 @@
+import io
+
+from src.output_sink import BufferedSink, EventSink, ListSink
+from src.video_player import VideoPlayer
+
+
+def test_list_sink_collects_lines(capfd):
+    sink = ListSink()
+    player = VideoPlayer(output=sink)
+    player.number_of_videos()
+    player.play_video("funny_dogs_video_id")
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert sink.lines == ["5 videos in the library",
+                          "Playing video: Funny Dogs"]
+
+
+def test_event_sink_gets_listing_in_one_write():
+    sink = EventSink()
+    player = VideoPlayer(output=sink)
+    player.show_all_videos()
+    assert len(sink.events) == 1
+    assert len(sink.events[0]["lines"]) == 6
+
+
+def test_buffered_sink_writes_in_blocks():
+    stream = io.StringIO()
+    sink = BufferedSink(stream, limit=200)
+    player = VideoPlayer(output=sink)
+    player.number_of_videos()
+    assert stream.getvalue() == ""
+    player.show_all_videos()
+    assert stream.getvalue().count("\n") == 7
+    player.number_of_videos()
+    sink.flush()
+    assert stream.getvalue().endswith("5 videos in the library\n")
+
+
+def test_buffered_sink_flushes_before_asking():
+    stream = io.StringIO()
+    answers = []
+
+    def ask(prompt):
+        answers.append(stream.getvalue())
+        return "no"
+
+    player = VideoPlayer(ask=ask, output=BufferedSink(stream))
+    player.search_videos("cat")
+    assert "Here are the results for cat:" in answers[0]
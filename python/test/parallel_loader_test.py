@@ -0,0 +1,88 @@
+from src.parallel_loader import parse_parallel, parse_range, split_ranges
+from src.video_library import DEFAULT_CATALOGUE, VideoLibrary
+
+
+def ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_split_ranges_end_at_line_boundaries(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    data = b"".join(b"Video %d | id%d | #tag\n" % (row, row)
+                    for row in range(100))
+    catalogue.write_bytes(data)
+
+    for parts in (1, 2, 3, 7, 1000):
+        ranges = split_ranges(catalogue, parts)
+        assert 1 <= len(ranges) <= parts
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        for (_, end), (start, _) in zip(ranges, ranges[1:]):
+            assert end == start and data[end - 1:end] == b"\n"
+
+
+def test_parse_range_indexes_its_rows(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    catalogue.write_text(
+        "Zebra | z | #b, #A\n"
+        "\n"
+        "broken line\n"
+        "Apple | a | #a\n")
+    index = parse_range(catalogue, 0, catalogue.stat().st_size)
+    assert index.titles == ["Zebra", "Apple"]
+    assert index.title_order == [1, 0]
+    assert index.postings == {"#a": [1, 0], "#b": [0]}
+    assert list(index.title_postings["ebr"]) == [0]
+    assert list(index.title_postings["ppl"]) == [1]
+    assert index.skipped == 1
+
+
+def test_parallel_load_matches_serial_load(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    catalogue.write_text("".join(
+        f"Video {row % 37} | id{row} | #tag{row % 5}, #Tag{row % 3}\n"
+        for row in range(500)) + "bad row\n")
+    serial = VideoLibrary(catalogue)
+    reports = []
+    library = VideoLibrary(catalogue, progress=reports.append, workers=3)
+
+    assert len(library) == 500
+    assert library.load_stats.skipped == 1
+    assert len(reports) == 3
+    assert ids(library.get_videos_by_title()) == ids(
+        serial.get_videos_by_title())
+    assert ids(library.search_titles("video 1")) == ids(
+        serial.search_titles("video 1"))
+    for query in ("#tag1", "#TAG2 -#tag0", "#tag4|#tag1"):
+        assert ids(library.search_tags(query)) == ids(
+            serial.search_tags(query))
+    assert library.get_video("id7").tags == ("#tag2", "#Tag1")
+
+
+def test_parallel_load_of_the_default_catalogue():
+    library = VideoLibrary(DEFAULT_CATALOGUE, workers=2)
+    assert ids(library.get_videos_by_title()) == ids(
+        VideoLibrary().get_videos_by_title())
+
+
+def test_repeated_video_ids_keep_the_last_row(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    catalogue.write_text(
+        "Zed | a | #x\n"
+        "Mid | b | #x\n"
+        "Alpha | c | #x\n"
+        "New | a | #y\n")
+    for library in (VideoLibrary(catalogue, chunk_size=1),
+                    VideoLibrary(catalogue, workers=4)):
+        assert [video.title for video in library.get_videos_by_title()] == [
+            "Alpha", "Mid", "New"]
+        assert ids(library.search_tags("#x")) == ["c", "b"]
+        assert ids(library.search_tags("#y")) == ["a"]
+
+
+def test_parse_parallel_of_an_empty_file(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    catalogue.write_text("")
+    reports = []
+    assert list(parse_parallel(catalogue, 4, reports.append)) == []
+    assert len(reports) == 1
+    assert len(VideoLibrary(catalogue, workers=4)) == 0
@@ -1,5 +1,6 @@
 import re
 from src.video_player import VideoPlayer
+from src.video import Video
 
 
 def test_number_of_videos(capfd):
@@ -236,3 +237,66 @@ def test_continue_none_playing(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "Cannot continue video: No video is currently playing" in lines[0]
+
+
+def test_play_random_video_queues_distinct_videos(capfd):
+    player = VideoPlayer()
+    player.play_random_video(3)
+    player.play_next_video()
+    player.play_next_video()
+    player.play_next_video()
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 8
+    played = lines[0][len("Playing video: "):]
+    queued = [line[len("Queued video: "):] for line in lines[1:3]]
+    assert len({played, *queued}) == 3
+    assert f"Stopping video: {played}" in lines[3]
+    assert f"Playing video: {queued[0]}" in lines[4]
+    assert f"Playing video: {queued[1]}" in lines[6]
+    assert "Cannot play next video: No videos are queued" in lines[7]
+
+
+def test_play_random_video_twice_replaces_the_queue(capfd):
+    player = VideoPlayer()
+    player.play_random_video(3)
+    first = player.playback.current_video
+    player.play_random_video(4)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 8
+    assert f"Stopping video: {first.title}" in lines[3]
+    played = player.playback.current_video
+    queued = list(player.playback.queue)
+    assert len(queued) == 3
+    assert len({played, *queued}) == 4
+    assert first not in (played, *queued)
+    assert f"Playing video: {played.title}" in lines[4]
+    assert [f"Queued video: {video.title}" for video in queued] == lines[5:]
+
+    player.play_video("funny_dogs_video_id")
+    assert not player.playback.queue
+
+
+def test_show_all_videos_page(capfd):
+    player = VideoPlayer()
+    player.show_all_videos(limit=2, offset=1)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 3
+    assert "Here's a list of all available videos:" in lines[0]
+    assert "Another Cat Video (another_cat_video_id) [#cat #animal]" in lines[1]
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[2]
+
+
+def test_video_string_is_cached_per_video():
+    player = VideoPlayer()
+    video = player._video_library.get_video("amazing_cats_video_id")
+    text = player.video_string(video)
+    assert text == "Amazing Cats (amazing_cats_video_id) [#cat #animal]"
+    assert player.video_string(video) is text
+
+    replaced = Video("Amazing Cats 2", "amazing_cats_video_id", ["#cat"])
+    assert player._video_library.update_video(replaced)
+    assert (player.video_string(replaced)
+            == "Amazing Cats 2 (amazing_cats_video_id) [#cat]")
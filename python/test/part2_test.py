@@ -180,6 +180,20 @@ def test_remove_from_playlist_nonexistent_video(capfd):
     assert "Cannot remove video from my_cool_playlist: Video does not exist" in lines[2]
 
 
+def test_remove_from_playlist_video_removed_from_library(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_cool_playlist")
+    player.add_to_playlist("my_cool_playlist", "amazing_cats_video_id")
+    player._video_library.remove_video("amazing_cats_video_id")
+    player.remove_from_playlist("my_cool_playlist", "amazing_cats_video_id")
+    player.remove_from_playlist("my_cool_playlist", "amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Removed video from my_cool_playlist: amazing_cats_video_id" in lines[2]
+    assert "Cannot remove video from my_cool_playlist: Video does not exist" in lines[3]
+
+
 def test_remove_from_playlist_nonexistent_playlist(capfd):
     player = VideoPlayer()
     player.remove_from_playlist("my_cool_playlist", "amazing_cats_video_id")
@@ -235,3 +249,49 @@ def test_delete_playlist_nonexistent(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "Cannot delete playlist my_cool_playlist: Playlist does not exist" in lines[0]
+
+
+def test_add_to_playlist_already_in_another_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_cool_playlist")
+    player.create_playlist("another_playlist")
+    player.add_to_playlist("my_cool_playlist", "amazing_cats_video_id")
+    player.add_to_playlist("another_playlist", "amazing_cats_video_id")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 4
+    assert "Added video to my_cool_playlist: Amazing Cats" in lines[2]
+    assert "Added video to another_playlist: Amazing Cats" in lines[3]
+
+
+def test_add_all_to_playlist(capfd):
+    player = VideoPlayer()
+    player.create_playlist("my_cool_playlist")
+    player.add_to_playlist("my_cool_playlist", "funny_dogs_video_id")
+    player.add_all_to_playlist("my_COOL_playlist", [
+        "amazing_cats_video_id", "funny_dogs_video_id",
+        "some_other_video_id", "life_at_google_video_id",
+        "amazing_cats_video_id"])
+    player.show_playlist("my_cool_playlist")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 10
+    assert ("Cannot add video funny_dogs_video_id to my_COOL_playlist: "
+            "Video already added") in lines[2]
+    assert ("Cannot add video some_other_video_id to my_COOL_playlist: "
+            "Video does not exist") in lines[3]
+    assert ("Cannot add video amazing_cats_video_id to my_COOL_playlist: "
+            "Video already added") in lines[4]
+    assert "Added 2 videos to my_COOL_playlist" in lines[5]
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[7]
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in lines[8]
+    assert "Life at Google (life_at_google_video_id) [#google #career]" in lines[9]
+
+
+def test_add_all_to_playlist_nonexistent_playlist(capfd):
+    player = VideoPlayer()
+    player.add_all_to_playlist("another_playlist", ["amazing_cats_video_id"])
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 1
+    assert "Cannot add videos to another_playlist: Playlist does not exist" in lines[0]
@@ -140,3 +140,59 @@ def test_search_videos_tag_no_results(capfd):
     lines = out.splitlines()
     assert len(lines) == 1
     assert "No search results for #blah" in lines[0]
+
+
+@mock.patch('builtins.input', lambda *args: '3')
+def test_search_videos_page_and_play_answer(capfd):
+    player = VideoPlayer()
+    player.search_videos_tag("#animal", limit=1, offset=2)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Here are the results for #animal:" in lines[0]
+    assert "3) Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[1]
+    assert "Playing video: Funny Dogs" in lines[4]
+
+
+def test_search_videos_page_past_the_end(capfd):
+    player = VideoPlayer()
+    player.search_videos("cat", offset=2)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 1
+    assert "No search results for cat" in lines[0]
+
+
+def test_search_videos_not_interactive_then_play_result(capfd):
+    player = VideoPlayer(interactive=False)
+    player.search_videos("cat")
+    player.play_result(2)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 5
+    assert "Here are the results for cat:" in lines[0]
+    assert "Use PLAY_RESULT <number> to play any of the above." in lines[3]
+    assert "Playing video: Another Cat Video" in lines[4]
+
+
+def test_find_videos_tag_returns_page(capfd):
+    player = VideoPlayer()
+    results = player.find_videos_tag("#animal", limit=1, offset=2)
+    out, err = capfd.readouterr()
+    assert out == ""
+    assert [video.video_id for video in results] == ["funny_dogs_video_id"]
+    assert results.get(3).video_id == "funny_dogs_video_id"
+    assert results.get(1) is None
+    assert player.last_results is results
+
+
+def test_play_result_errors(capfd):
+    player = VideoPlayer(interactive=False)
+    player.play_result(1)
+    player.find_videos("cat")
+    player.play_result(3)
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert len(lines) == 2
+    assert "Cannot play result: No search results to play from" in lines[0]
+    assert "Cannot play result: There is no result number 3" in lines[1]
@@ -0,0 +1,94 @@
+import json
+
+from src.playlist_journal import PlaylistJournal, open_playlists
+
+
+def _contents(store):
+    return {playlist.name: list(playlist.videos)
+            for playlist in store.playlists.values()}
+
+
+def _fill(store):
+    store.add_playlist("My List")
+    store.add_videos("my list", ["a", "b", "c"])
+    store.remove_video("MY LIST", "b")
+    store.add_playlist("Other")
+    store.add_video("Other", "a")
+    store.clear_playlist("other")
+    store.add_playlist("Gone")
+    store.delete_playlist("gone")
+
+
+def test_changes_are_replayed(tmp_path):
+    path = tmp_path / "playlists.log"
+    store = open_playlists(path)
+    _fill(store)
+    store.journal.close()
+
+    loaded = open_playlists(path)
+    assert _contents(loaded) == {"My List": ["a", "c"], "Other": []}
+    assert loaded.names() == ["My List", "Other"]
+    loaded.journal.close()
+
+
+def test_failed_changes_are_not_logged(tmp_path):
+    path = tmp_path / "playlists.log"
+    store = open_playlists(path)
+    store.add_playlist("A")
+    store.add_playlist("a")
+    store.add_videos("a", ["x"])
+    store.add_videos("a", ["x"])
+    store.remove_video("missing", "x")
+    store.journal.close()
+
+    assert len(path.read_text().splitlines()) == 3
+
+
+def test_compaction_bounds_the_log(tmp_path):
+    path = tmp_path / "playlists.log"
+    store = open_playlists(path, compact_every=3)
+    _fill(store)
+    store.journal.close()
+
+    # 8 changes: two compactions, then two entries after the header.
+    assert len(path.read_text().splitlines()) == 3
+    snapshot = json.loads((tmp_path / "playlists.log.snapshot").read_text())
+    assert snapshot["generation"] == 2
+    loaded = open_playlists(path)
+    assert _contents(loaded) == {"My List": ["a", "c"], "Other": []}
+
+
+def test_stale_log_and_torn_entry_are_ignored(tmp_path):
+    path = tmp_path / "playlists.log"
+    store = open_playlists(path)
+    store.add_playlist("A")
+    store.journal.compact()
+    store.journal.close()
+    # As if compaction crashed before the log was started afresh.
+    path.write_text('{"generation": 0}\n'
+                    '{"op": "delete", "name": "A"}\n')
+    assert _contents(open_playlists(path)) == {"A": []}
+
+    path.write_text('{"generation": 1}\n'
+                    '{"op": "add", "name": "A", "video_ids": ["x"]}\n'
+                    '{"op": "add", "na')
+    journal = PlaylistJournal(path)
+    assert _contents(journal.load()) == {"A": ["x"]}
+    journal.close()
+
+
+def test_changes_after_a_torn_entry_survive_another_crash(tmp_path):
+    path = tmp_path / "playlists.log"
+    store = open_playlists(path)
+    store.add_playlist("A")
+    for video_id in "xy":
+        store.journal.close()
+        with open(path, "a", encoding="utf-8") as log:
+            log.write('{"op": "add", "name": "A", "vid')
+        store = open_playlists(path)
+        store.add_video("A", video_id)
+    store.journal.close()
+
+    assert _contents(open_playlists(path)) == {"A": ["x", "y"]}
+    assert path.read_text().endswith(
+        '{"op": "add", "name": "A", "video_ids": ["y"]}\n')
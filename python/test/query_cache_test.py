@@ -0,0 +1,81 @@
+from src.query_cache import QueryCache
+from src.video_library import VideoLibrary
+
+
+def test_get_counts_hits_and_misses():
+    cache = QueryCache()
+    assert cache.get("cat", 0) is None
+    cache.put("cat", 0, None, ["a", "b"])
+
+    assert cache.get("cat", 0) == ["a", "b"]
+    assert cache.get("cat", 0, limit=1) == ["a"]
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def test_version_change_invalidates():
+    cache = QueryCache()
+    cache.put("cat", 0, None, ["a"])
+
+    assert cache.get("cat", 1) is None
+    assert len(cache) == 0
+
+
+def test_limited_results_answer_smaller_limits_only():
+    cache = QueryCache()
+    cache.put("cat", 0, 2, ["a", "b"])
+    assert cache.get("cat", 0, limit=1) == ["a"]
+    assert cache.get("cat", 0, limit=3) is None
+    assert cache.get("cat", 0) is None
+
+    # Fewer results than the limit are all of them.
+    cache.put("dog", 0, 5, ["c"])
+    assert cache.get("dog", 0) == ["c"]
+
+
+def test_ttl_and_size():
+    now = [0.0]
+    cache = QueryCache(size=2, ttl=10, clock=lambda: now[0])
+    cache.put("a", 0, None, [1])
+    cache.put("b", 0, None, [2])
+    cache.get("a", 0)
+    cache.put("c", 0, None, [3])
+    assert cache.get("b", 0) is None
+    assert cache.get("a", 0) == [1]
+
+    now[0] = 11.0
+    assert cache.get("a", 0) is None
+
+
+def test_library_searches_are_cached_until_it_changes():
+    library = VideoLibrary()
+    library.search_tags("#cat #animal")
+    library.search_tags("#ANIMAL,#cat")
+    assert (library.query_cache.hits, library.query_cache.misses) == (1, 1)
+
+    library._remove("amazing_cats_video_id")
+    assert [video.video_id for video in library.search_tags("#cat")] == [
+        "another_cat_video_id"]
+    assert library.query_cache.misses == 2
+
+
+def test_fetch_stores_only_small_or_finished_searches():
+    cache = QueryCache(max_results=2)
+    searches = []
+
+    def search(limit):
+        searches.append(limit)
+        return iter(["a", "b", "c"][:limit])
+
+    assert cache.fetch("x", 0, 2, search) == ["a", "b"]
+    assert cache.fetch("x", 0, 1, search) == ["a"]
+    assert cache.fetch("x", 0, 3, search) == ["a", "b", "c"]
+    assert searches == [2, 3]
+    assert cache.get("x", 0, 3) is None
+
+    # Unbounded searches are passed through lazily.
+    results = cache.fetch("y", 0, None, lambda limit: iter(["a"]))
+    assert len(cache) == 1
+    assert list(results) == ["a"]
+    assert cache.get("y", 0) == ["a"]
+    assert list(cache.fetch("z", 0, None, search)) == ["a", "b", "c"]
+    assert cache.get("z", 0) is None
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from src import command_parser
+from src.command_parser import register_command
+from src.run import main, run_script
+
+
+def test_run_script_matches_interactive_output():
+    script = io.StringIO(
+        "NUMBER_OF_VIDEOS\n"
+        "SEARCH_VIDEOS cat\n"
+        "2\n"
+        "PLAY\n"
+        "SHOW_PLAYING\n"
+        "EXIT\n"
+        "STOP\n")
+    output = io.StringIO()
+    timings = io.StringIO()
+    assert run_script(script, output, timings) == 4
+
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 12
+    assert "Hello and welcome to YouTube" in lines[0]
+    assert "5 videos in the library" in lines[2]
+    assert "Here are the results for cat:" in lines[3]
+    assert "Playing video: Another Cat Video" in lines[8]
+    assert "Please enter PLAY command followed by video_id." in lines[9]
+    assert "Currently playing: Another Cat Video" in lines[10]
+    assert "Thank you and goodbye!" in lines[11]
+
+    commands = [line.split("\t")[1]
+                for line in timings.getvalue().splitlines()]
+    assert commands == [
+        "NUMBER_OF_VIDEOS", "SEARCH_VIDEOS cat", "PLAY", "SHOW_PLAYING"]
+
+
+def test_run_script_without_exit():
+    output = io.StringIO()
+    assert run_script(["PLAY amazing_cats_video_id\n"], output) == 1
+    assert "Playing video: Amazing Cats" in output.getvalue()
+    assert output.getvalue().endswith("Thank you and goodbye!\n")
+
+
+def test_run_script_writes_output_before_a_failure(monkeypatch):
+    monkeypatch.setattr(
+        command_parser, "_COMMANDS", dict(command_parser._COMMANDS))
+
+    def fail(player):
+        raise RuntimeError("broken command")
+
+    register_command("FAIL", fail)
+    output = io.StringIO()
+    with pytest.raises(RuntimeError):
+        run_script(["NUMBER_OF_VIDEOS\n", "FAIL\n", "STOP\n"], output)
+    lines = output.getvalue().splitlines()
+    assert len(lines) == 3
+    assert "5 videos in the library" in lines[2]
+
+
+def test_main_keeps_playlists(tmp_path, capsys):
+    journal = str(tmp_path / "playlists.log")
+    first = tmp_path / "first.txt"
+    first.write_text("CREATE_PLAYLIST Mine\n"
+                     "ADD_TO_PLAYLIST Mine amazing_cats_video_id\n")
+    second = tmp_path / "second.txt"
+    second.write_text("SHOW_PLAYLIST Mine\n")
+
+    main(["--script", str(first), "--playlists", journal])
+    capsys.readouterr()
+    main(["--script", str(second), "--playlists", journal])
+    out = capsys.readouterr().out
+    assert "Amazing Cats (amazing_cats_video_id) [#cat #animal]" in out
+
+
+def test_main_reports_a_backend_without_its_catalogue(capsys):
+    with pytest.raises(SystemExit) as exit_info:
+        main(["--backend", "sqlite", "--script", "-"])
+    assert exit_info.value.code == 2
+    assert "sqlite backend needs a catalogue" in capsys.readouterr().err
@@ -0,0 +1,91 @@
+import asyncio
+
+from src.server import PROMPT, CommandServer
+from src.session_manager import SessionManager
+
+
+async def _read_response(reader):
+    data = await reader.readuntil(PROMPT.encode("utf-8"))
+    return data.decode("utf-8")[:-len(PROMPT)].splitlines()
+
+
+async def _connect(server):
+    host, port = server.sockets[0].getsockname()[:2]
+    reader, writer = await asyncio.open_connection(host, port)
+    greeting = await _read_response(reader)
+    assert "Hello and welcome to YouTube" in greeting[0]
+    return reader, writer
+
+
+def test_pipelined_commands_get_ordered_responses():
+    async def scenario():
+        server = await CommandServer(SessionManager()).start()
+        async with server:
+            reader, writer = await _connect(server)
+            writer.write(b"PLAY amazing_cats_video_id\n"
+                         b"SEARCH_VIDEOS dog\n"
+                         b"PLAY_RESULT 1\n"
+                         b"PLAY\n"
+                         b"EXIT\n")
+            responses = [await _read_response(reader) for _ in range(4)]
+            goodbye = await reader.read()
+            writer.close()
+        return responses, goodbye
+
+    responses, goodbye = asyncio.run(scenario())
+    assert responses[0] == ["Playing video: Amazing Cats"]
+    assert responses[1] == [
+        "Here are the results for dog:",
+        "    1) Funny Dogs (funny_dogs_video_id) [#dog #animal]",
+        "Use PLAY_RESULT <number> to play any of the above."]
+    assert responses[2] == ["Stopping video: Amazing Cats",
+                            "Playing video: Funny Dogs"]
+    assert responses[3] == ["Please enter PLAY command followed by video_id."]
+    assert b"Thank you and goodbye!" in goodbye
+
+
+def test_connections_have_their_own_sessions():
+    sessions = SessionManager()
+
+    async def client(server, number):
+        reader, writer = await _connect(server)
+        writer.write(f"CREATE_PLAYLIST list{number}\n"
+                     "SHOW_ALL_PLAYLISTS\n".encode("utf-8"))
+        await _read_response(reader)
+        response = await _read_response(reader)
+        writer.close()
+        await writer.wait_closed()
+        return response
+
+    async def scenario():
+        server = await CommandServer(sessions).start()
+        async with server:
+            responses = await asyncio.gather(
+                *(client(server, number) for number in range(200)))
+            # The server closes a session once it sees the client go.
+            for _ in range(100):
+                if not len(sessions):
+                    break
+                await asyncio.sleep(0.01)
+        return responses
+
+    responses = asyncio.run(scenario())
+    assert responses == [["Showing all playlists:", f"list{number}"]
+                         for number in range(200)]
+    assert len(sessions) == 0
+
+
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "youtube.sock")
+
+    async def scenario():
+        server = await CommandServer(SessionManager()).start(path=path)
+        async with server:
+            reader, writer = await asyncio.open_unix_connection(path)
+            await _read_response(reader)
+            writer.write(b"NUMBER_OF_VIDEOS\n")
+            response = await _read_response(reader)
+            writer.close()
+        return response
+
+    assert asyncio.run(scenario()) == ["5 videos in the library"]
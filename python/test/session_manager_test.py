@@ -0,0 +1,52 @@
+from src.output_sink import ListSink
+from src.playlist_journal import open_playlists
+from src.session_manager import SessionManager
+
+
+def test_sessions_share_the_library_only():
+    manager = SessionManager()
+    alice = manager.open_session("alice", output=ListSink())
+    bob = manager.open_session("bob", output=ListSink())
+    assert manager.open_session("alice") is alice
+    assert len(manager) == 2
+
+    assert alice.player._video_library is bob.player._video_library
+    assert alice.player.playback is not bob.player.playback
+    assert alice.player.all_playlists is not bob.player.all_playlists
+
+    alice.parser.execute_command(["PLAY", "amazing_cats_video_id"])
+    alice.parser.execute_command(["CREATE_PLAYLIST", "mine"])
+    bob.parser.execute_command(["SHOW_PLAYING"])
+    bob.parser.execute_command(["SHOW_PLAYLIST", "mine"])
+    assert alice.player._out.lines == [
+        "Playing video: Amazing Cats",
+        "Successfully created new playlist: mine"]
+    assert bob.player._out.lines == [
+        "No video is currently playing",
+        "Cannot show playlist mine: Playlist does not exist"]
+
+
+def test_close_session():
+    manager = SessionManager()
+    manager.open_session("alice")
+    assert "alice" in manager
+    assert manager.close_session("alice")
+    assert not manager.close_session("alice")
+    assert manager.get_session("alice") is None
+
+
+def test_playlists_per_user(tmp_path):
+    def playlists(user_id):
+        return open_playlists(tmp_path / f"{user_id}.log")
+
+    manager = SessionManager(playlists=playlists)
+    session = manager.open_session("alice", output=ListSink())
+    session.player.create_playlist("mine")
+    store = session.player.all_playlists
+    manager.close_session("alice")
+    assert store.journal is None
+
+    session = manager.open_session("alice", output=ListSink())
+    assert session.player.all_playlists.exists("mine")
+    assert not manager.open_session(
+        "bob", output=ListSink()).player.all_playlists.exists("mine")
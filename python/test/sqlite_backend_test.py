@@ -0,0 +1,110 @@
+import pytest
+
+from src.backends import detect_backend, open_library
+from src.compile_catalogue import main
+from src.sqlite_backend import (
+    SqlitePlaylist, SqliteVideoLibrary, build_sqlite_catalogue)
+from src.video import Video
+from src.video_library import DEFAULT_CATALOGUE, VideoLibrary
+from src.video_player import VideoPlayer
+
+
+@pytest.fixture
+def library(tmp_path):
+    path = tmp_path / "videos.db"
+    assert build_sqlite_catalogue(DEFAULT_CATALOGUE, path) == 5
+    library = SqliteVideoLibrary(path)
+    yield library
+    library.close()
+
+
+def _ids(videos):
+    return [video.video_id for video in videos]
+
+
+def test_matches_the_memory_library(library):
+    memory = VideoLibrary()
+    assert len(library) == len(memory)
+    assert _ids(library.get_videos_by_title()) == _ids(
+        memory.get_videos_by_title())
+    assert _ids(library.iter_videos_by_title(3)) == _ids(
+        memory.iter_videos_by_title(3))
+    for term in ("cat", "CAT", "a", "at g", "nothing at all", ""):
+        assert _ids(library.search_titles(term)) == _ids(
+            memory.search_titles(term))
+    for query in ("#cat", "#ANIMAL -#cat", "#cat|#dog #animal", "#blah"):
+        assert _ids(library.search_tags(query, limit=2)) == _ids(
+            memory.search_tags(query, limit=2))
+    video = library.get_video("funny_dogs_video_id")
+    assert (video.title, video.tags) == ("Funny Dogs", ("#dog", "#animal"))
+    assert library.get_video("missing") is None
+
+
+def test_random_videos(library):
+    picks = library.random_videos(10, exclude=["nothing_video_id"])
+    assert len(picks) == 4
+    assert "nothing_video_id" not in _ids(picks)
+
+
+def test_mutations_update_the_indexes(library):
+    zebra = Video("Zebra Cats", "zebra_video_id", ["#Cat"])
+    assert library.add_video(zebra)
+    assert not library.add_video(zebra)
+    assert _ids(library.search_titles("zebra")) == ["zebra_video_id"]
+    assert _ids(library.search_tags("#cat"))[-1] == "zebra_video_id"
+
+    assert library.update_video(Video("Aardvark", "zebra_video_id", []))
+    assert library.search_titles("zebra") == []
+    assert _ids(library.iter_videos_by_title())[0] == "zebra_video_id"
+
+    assert library.remove_video("zebra_video_id")
+    assert not library.remove_video("zebra_video_id")
+    assert not library.update_video(zebra)
+    assert len(library) == 5
+
+
+def test_playlists(library):
+    playlists = SqlitePlaylist(library.connection)
+    assert playlists.add_playlist("My List")
+    assert not playlists.add_playlist("my list")
+    assert playlists.add_videos("MY LIST", ["b", "a", "b"]) == 2
+    assert not playlists.add_video("my list", "a")
+    assert playlists.remove_video("my list", "b")
+    assert list(playlists.get("my list")) == ["a"]
+    assert playlists.get("My List").name == "My List"
+    assert playlists.names() == ["My List"]
+    assert playlists.clear_playlist("my list")
+    assert len(playlists.get("my list")) == 0
+    assert playlists.delete_playlist("my list")
+    assert not playlists.exists("my list")
+    assert playlists.get("my list") is None
+
+
+def test_player_on_sqlite_backend(tmp_path, capfd):
+    path = tmp_path / "videos.db"
+    assert main(["--format", "sqlite", str(DEFAULT_CATALOGUE), str(path)]) == 0
+    assert detect_backend(path) == "sqlite"
+    assert detect_backend(DEFAULT_CATALOGUE) == "memory"
+    capfd.readouterr()
+
+    library = open_library(path)
+    player = VideoPlayer(library, playlists=SqlitePlaylist(library.connection),
+                         interactive=False)
+    player.search_videos_tag("#animal", limit=1, offset=1)
+    player.create_playlist("mine")
+    player.add_to_playlist("mine", "funny_dogs_video_id")
+    player.show_playlist("MINE")
+    out, err = capfd.readouterr()
+    lines = out.splitlines()
+    assert "2) Another Cat Video (another_cat_video_id) [#cat #animal]" in (
+        lines[1])
+    assert "Funny Dogs (funny_dogs_video_id) [#dog #animal]" in lines[-1]
+    library.close()
+
+
+def test_open_library_rejects_catalogues_of_another_backend():
+    for backend in ("mapped", "sqlite"):
+        with pytest.raises(ValueError, match="needs a catalogue"):
+            open_library(backend=backend)
+        with pytest.raises(ValueError, match="is not a"):
+            open_library(DEFAULT_CATALOGUE, backend)
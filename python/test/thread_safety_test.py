@@ -0,0 +1,88 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from benchmarks.synthetic import write_catalogue
+from benchmarks.thread_stress import check, hammer
+from src.output_sink import ListSink
+from src.playlist_journal import open_playlists
+from src.query_cache import QueryCache
+from src.video_library import VideoLibrary
+from src.video_player import VideoPlayer
+from src.video_playlist import ConcurrentPlaylist
+
+WORKERS = 8
+OPERATIONS = 200
+
+
+def _library(tmp_path):
+    return VideoLibrary(write_catalogue(tmp_path / "videos.txt", 5000))
+
+
+def test_stress_playlists_stay_consistent(tmp_path):
+    library = _library(tmp_path)
+    video_ids = [video.video_id for video in library]
+    # Compacting often checks that snapshots taken while other threads
+    # change the playlists lose nothing.
+    playlists = open_playlists(tmp_path / "playlists.log",
+                               ConcurrentPlaylist(), compact_every=50)
+    player = VideoPlayer(library, output=ListSink(), interactive=False,
+                         playlists=playlists, thread_safe=True)
+    hammer(player, video_ids, WORKERS, OPERATIONS)
+    check(player, video_ids, WORKERS, OPERATIONS)
+    playlists.journal.close()
+
+    reloaded = VideoPlayer(library, output=ListSink(), playlists=open_playlists(
+        tmp_path / "playlists.log"))
+    check(reloaded, video_ids, WORKERS, OPERATIONS)
+
+
+def test_searches_run_alongside_random_plays(tmp_path):
+    library = _library(tmp_path)
+    # Every search reads the library rather than the cache.
+    library.query_cache = QueryCache(max_results=0)
+    player = VideoPlayer(library, output=ListSink(), interactive=False,
+                         thread_safe=True)
+    expected = [video.video_id for video in library.iter_search_titles("live")]
+
+    def work(worker):
+        if worker % 2:
+            for _ in range(OPERATIONS):
+                player.play_random_video(10)
+            return []
+        return [[video.video_id for video in library.iter_search_titles(
+            "live")] for _ in range(OPERATIONS // 4)]
+
+    # Switching threads often makes them interleave within a command.
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        with ThreadPoolExecutor(WORKERS) as pool:
+            results = [result for results in pool.map(work, range(WORKERS))
+                       for result in results]
+    finally:
+        sys.setswitchinterval(switch_interval)
+    assert all(result == expected for result in results)
+    assert all(library.get_video(video.video_id) is video
+               for video in library)
+
+
+def test_thread_safe_player_needs_concurrent_playlists(tmp_path):
+    playlists = open_playlists(tmp_path / "playlists.log")
+    with pytest.raises(ValueError, match="ConcurrentPlaylist"):
+        VideoPlayer(_library(tmp_path), playlists=playlists, thread_safe=True)
+    playlists.journal.close()
+
+
+def test_racing_creates_succeed_once(tmp_path):
+    output = ListSink()
+    player = VideoPlayer(_library(tmp_path), output=output, thread_safe=True)
+    with ThreadPoolExecutor(WORKERS) as pool:
+        list(pool.map(lambda _: player.create_playlist("mine"),
+                      range(WORKERS * 4)))
+        list(pool.map(lambda _: player.delete_playlist("MINE"),
+                      range(WORKERS * 4)))
+
+    assert output.lines.count("Successfully created new playlist: mine") == 1
+    assert output.lines.count("Deleted playlist: MINE") == 1
@@ -0,0 +1,48 @@
+from src.title_index import TitleIndex
+from src.video_library import VideoLibrary
+
+
+def test_search_finds_substrings_of_any_length():
+    index = TitleIndex()
+    index.add_all(["a", "b", "c"], ["Amazing Cats", "Funny Dogs", "Cat Go"])
+
+    assert index.search("CAT") == {"a", "c"}
+    assert index.search("cats") == {"a"}
+    assert index.search("t go") == {"c"}
+    assert index.search("g") == {"a", "b", "c"}
+    assert index.search("zebra") == set()
+    assert index.search("") == {"a", "b", "c"}
+
+
+def test_add_replaces_and_remove_drops_titles():
+    index = TitleIndex()
+    index.add("a", "Amazing Cats")
+    index.add("a", "Funny Dogs")
+    assert index.search("cat") == set()
+    assert index.search("dog") == {"a"}
+
+    index.remove("a")
+    index.remove("unknown")
+    assert len(index) == 0
+    assert index.search("dog") == set()
+
+
+def test_removed_slots_are_reclaimed():
+    index = TitleIndex()
+    index.add_all([f"id{row}" for row in range(10)],
+                  [f"Video {row}" for row in range(10)])
+    for row in range(8):
+        index.remove(f"id{row}")
+
+    assert len(index._video_ids) < 10
+    assert index.search("video") == {"id8", "id9"}
+    index.add("id0", "Video 0")
+    assert index.search("video 0") == {"id0"}
+
+
+def test_library_indexes_titles_when_it_loads():
+    library = VideoLibrary()
+    assert len(library._title_index) == len(library)
+    # Terms shorter than a trigram are matched by scanning in title order.
+    assert [video.title for video in library.search_titles("ca", limit=2)] == [
+        "Amazing Cats", "Another Cat Video"]
@@ -0,0 +1,35 @@
+from src.video_playlist import Playlist
+
+
+def test_playlist_lookup_is_case_insensitive():
+    playlists = Playlist()
+    assert playlists.add_playlist("My_Playlist")
+    assert not playlists.add_playlist("MY_PLAYLIST")
+
+    assert playlists.exists("my_playlist")
+    assert playlists.get("my_PLAYLIST").name == "My_Playlist"
+    assert playlists.get("another_playlist") is None
+
+
+def test_playlist_keeps_insertion_order():
+    playlists = Playlist()
+    playlists.add_playlist("my_playlist")
+    playlists.add_video("my_playlist", "b_video_id")
+    playlists.add_video("my_playlist", "a_video_id")
+    playlists.add_video("my_playlist", "c_video_id")
+    playlists.remove_video("my_playlist", "a_video_id")
+    playlists.add_video("my_playlist", "a_video_id")
+
+    assert list(playlists.get("my_playlist")) == [
+        "b_video_id", "c_video_id", "a_video_id"]
+
+
+def test_playlist_names_are_sorted():
+    playlists = Playlist()
+    playlists.add_playlist("my_playlist")
+    playlists.add_playlist("another_playlist")
+    playlists.add_playlist("zzz_playlist")
+    playlists.delete_playlist("MY_PLAYLIST")
+
+    assert playlists.names() == ["another_playlist", "zzz_playlist"]
+    assert len(playlists) == 2
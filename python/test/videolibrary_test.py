@@ -1,3 +1,4 @@
+from src.video import Video
 from src.video_library import VideoLibrary
 
 
@@ -24,3 +25,204 @@ def test_parses_video_correctly_without_tags():
     assert video.title == "Video about nothing"
     assert video.video_id == "nothing_video_id"
     assert video.tags == ()
+
+
+def test_search_titles_in_title_order():
+    library = VideoLibrary()
+    matches = library.search_titles("CAT")
+
+    assert [video.video_id for video in matches] == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert [video.video_id for video in library.search_titles("at go")] == [
+        "life_at_google_video_id"]
+    assert library.search_titles("about everything") == []
+
+
+def test_search_titles_after_remove():
+    library = VideoLibrary()
+    library._remove("amazing_cats_video_id")
+
+    assert [video.video_id for video in library.search_titles("cats")] == []
+    assert [video.video_id for video in library.search_titles("cat")] == [
+        "another_cat_video_id"]
+
+
+def test_search_tags_in_title_order():
+    library = VideoLibrary()
+
+    assert [video.video_id for video in library.search_tags("#ANIMAL")] == [
+        "amazing_cats_video_id", "another_cat_video_id",
+        "funny_dogs_video_id"]
+    assert library.search_tags("animal") == []
+
+
+def test_search_tags_query():
+    library = VideoLibrary()
+
+    def ids(query):
+        return [video.video_id for video in library.search_tags(query)]
+
+    assert ids("#cat,#animal") == [
+        "amazing_cats_video_id", "another_cat_video_id"]
+    assert ids("#animal -#cat") == ["funny_dogs_video_id"]
+    assert ids("#dog|#google") == [
+        "funny_dogs_video_id", "life_at_google_video_id"]
+    assert ids("#cat #dog") == []
+    assert ids("-#cat") == []
+
+
+def test_get_videos_by_title():
+    library = VideoLibrary()
+    library._remove("funny_dogs_video_id")
+
+    assert [video.title for video in library.get_videos_by_title()] == [
+        "Amazing Cats", "Another Cat Video", "Life at Google",
+        "Video about nothing"]
+
+
+def test_videos_view_is_read_only_and_live():
+    library = VideoLibrary()
+    view = library.videos()
+    snapshot = library.snapshot()
+
+    assert len(library) == len(view) == 5
+    assert set(library) == set(view) == set(snapshot)
+    assert not hasattr(view, "append")
+
+    library._remove("nothing_video_id")
+    assert len(view) == 4
+    assert len(snapshot) == 5
+
+
+def test_random_videos_are_distinct_and_respect_exclude():
+    library = VideoLibrary()
+    order = list(library.videos())
+
+    picks = library.random_videos(10, exclude={"funny_dogs_video_id"})
+    assert len(picks) == 4
+    assert len({video.video_id for video in picks}) == 4
+    assert "funny_dogs_video_id" not in {video.video_id for video in picks}
+    assert list(library.videos()) == order
+
+    assert library.random_video(
+        exclude={video.video_id for video in library}) is None
+
+
+def test_random_video_after_remove():
+    library = VideoLibrary()
+    library._remove("amazing_cats_video_id")
+    library._remove("nothing_video_id")
+
+    picks = library.random_videos(5)
+    assert {video.video_id for video in picks} == {
+        "another_cat_video_id", "funny_dogs_video_id",
+        "life_at_google_video_id"}
+    assert len(library.videos()) == 3
+
+
+def test_load_skips_malformed_rows(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    catalogue.write_bytes(
+        b"Funny Dogs | funny_dogs_video_id |  #dog , #animal\n"
+        b"\n"
+        b"Missing fields | broken_video_id\n"
+        b"Bad \xff encoding | bad_video_id | #tag\n"
+        b"Video about nothing | nothing_video_id |\n")
+    reports = []
+    library = VideoLibrary(catalogue, progress=reports.append, chunk_size=1)
+
+    assert len(library) == 2
+    assert library.get_video("funny_dogs_video_id").tags == ("#dog", "#animal")
+    assert library.load_stats.rows == 2
+    assert library.load_stats.skipped == 2
+    assert library.load_stats.fraction_done == 1.0
+    assert len(reports) == 3
+
+
+def test_videos_share_interned_tags():
+    library = VideoLibrary()
+    cats = library.get_video("amazing_cats_video_id")
+    dogs = library.get_video("funny_dogs_video_id")
+
+    assert cats.tags[1] is dogs.tags[1]
+    assert not hasattr(cats, "__dict__")
+
+    # Tags of videos added later are interned too, even passed as a tuple.
+    tag = "".join(["#ani", "mal"])
+    assert tag is not dogs.tags[1]
+    video = Video("Zebra", "zebra_video_id", (tag,))
+    assert video.tags[0] is dogs.tags[1]
+
+
+def test_load_replaces_video_repeated_in_a_later_chunk(tmp_path):
+    catalogue = tmp_path / "videos.txt"
+    catalogue.write_text(
+        "".join(f"Video {row:02} | id{row} | #old\n"
+                for row in range(19, -1, -1))
+        + "New title | id5 | #new\n")
+    library = VideoLibrary(catalogue, chunk_size=10)
+
+    assert len(library) == 20
+    titles = [video.title for video in library.get_videos_by_title()]
+    assert titles == sorted(titles) and "Video 05" not in titles
+    assert library.get_video("id5").title == "New title"
+    assert [video.video_id for video in library.search_tags("#new")] == [
+        "id5"]
+    assert len(library.search_tags("#old")) == 19
+
+
+def test_iter_search_is_lazy(monkeypatch):
+    library = VideoLibrary()
+    found = []
+    get_video = library._video
+
+    def video(video_id):
+        found.append(video_id)
+        return get_video(video_id)
+
+    monkeypatch.setattr(library, "_video", video)
+    results = library.iter_search_titles("a")
+
+    assert next(results).title == "Amazing Cats"
+    assert next(results).title == "Another Cat Video"
+    assert len(found) == 2
+    assert [video.title for video in library.iter_videos_by_title(3)] == [
+        "Life at Google", "Video about nothing"]
+
+
+def test_search_top_k():
+    library = VideoLibrary()
+
+    assert [video.title for video in library.search_titles("a", limit=2)] == [
+        "Amazing Cats", "Another Cat Video"]
+    assert [video.title for video in library.search_tags(
+        "#animal", limit=1)] == ["Amazing Cats"]
+    assert [video.title for video in library.search_tags(
+        "#animal -#cat", limit=1)] == ["Funny Dogs"]
+    assert library.search_tags("#animal", limit=0) == []
+
+
+def test_add_update_and_remove_video():
+    library = VideoLibrary()
+    video = Video("Zebra Cats", "zebra_video_id", ["#cat"])
+
+    assert library.add_video(video)
+    assert not library.add_video(video)
+    assert library.get_video("zebra_video_id") is video
+    assert [video.video_id for video in library.search_tags("#cat")] == [
+        "amazing_cats_video_id", "another_cat_video_id", "zebra_video_id"]
+    assert library.search_titles("zebra") == [video]
+
+    renamed = Video("Aardvark", "zebra_video_id", ["#aardvark"])
+    assert library.update_video(renamed)
+    assert library.get_videos_by_title()[0] is renamed
+    assert library.search_titles("zebra") == []
+    assert library.search_tags("#cat", limit=5)[-1].video_id == (
+        "another_cat_video_id")
+    assert library.search_tags("#aardvark") == [renamed]
+
+    assert library.remove_video("zebra_video_id")
+    assert not library.remove_video("zebra_video_id")
+    assert not library.update_video(renamed)
+    assert len(library) == 5
+    assert library.search_tags("#aardvark") == []